@@ -3,20 +3,34 @@ Provider Management Endpoints.
 Manages signal providers, API keys, and performance statistics.
 """
 
+import asyncio
 import logging
 import secrets
 import hashlib
+from collections import Counter
 from datetime import datetime, timezone
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
-from app.database import get_supabase
+from app.cache import TTLCache
+from app.database import get_supabase, run_query
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1", tags=["providers"])
 
+# Statuses that count as a closed trade for performance stats
+CLOSED_STATUSES = ("CLOSED", "TP3_HIT", "SL_HIT")
+
+# Active providers resolved during webhook ingest. The API-key cache is keyed
+# by the presented key itself (str hashing is enough for an in-memory lookup),
+# so SHA-256 only runs on a miss.
+providers_by_api_key = TTLCache(ttl_seconds=300, maxsize=1024)
+providers_by_name = TTLCache(ttl_seconds=300, maxsize=1024)
+# Fallback provider used when a webhook matches no key or name (one slot)
+default_provider = TTLCache(ttl_seconds=300, maxsize=1)
+
 
 # ============================================================================
 # Request/Response Models
@@ -81,10 +95,22 @@ class ProviderStatsResponse(BaseModel):
 # ============================================================================
 
 def hash_key(key: str) -> str:
-    """Hash an API key using SHA-256."""
+    """
+    Hash an API key using SHA-256.
+
+    Single implementation shared by provider registration and webhook
+    ingestion, so stored and looked-up hashes always match. Changing the
+    algorithm would invalidate every stored api_key_hash.
+    """
     return hashlib.sha256(key.encode()).hexdigest()
 
 
+def invalidate_provider_cache() -> None:
+    """Drop all cached provider lookups."""
+    for cache in (providers_by_api_key, providers_by_name, default_provider):
+        cache.clear()
+
+
 def generate_api_key() -> str:
     """Generate a cryptographically secure API key."""
     return secrets.token_urlsafe(32)
@@ -98,7 +124,7 @@ def generate_webhook_secret() -> str:
 def get_provider_signals_count(sb, provider_id: str, status: Optional[str] = None) -> int:
     """Count signals for a provider with optional status filter."""
     try:
-        query = sb.table("canonical_signals").select("*", count="exact").eq("provider_id", provider_id)
+        query = sb.table("canonical_signals").select("id", count="exact", head=True).eq("provider_id", provider_id)
         if status:
             query = query.eq("status", status)
         result = query.execute()
@@ -108,37 +134,75 @@ def get_provider_signals_count(sb, provider_id: str, status: Optional[str] = Non
         return 0
 
 
+def get_signal_counts_by_provider(sb) -> Optional[dict]:
+    """
+    Fetch signal counts for every provider in one query.
+
+    Returns a dict of provider_id -> {status -> count}, read from the
+    provider_signal_counts view, or None if the view could not be queried.
+    """
+    counts: dict = {}
+    try:
+        result = sb.table("provider_signal_counts").select("provider_id,status,signal_count").execute()
+        for row in (result.data or []):
+            counts.setdefault(row["provider_id"], {})[row["status"]] = row["signal_count"] or 0
+    except Exception as e:
+        logger.error(f"Failed to fetch provider signal counts: {e}")
+        return None
+    return counts
+
+
+async def count_signals_concurrently(sb, provider_ids: List[str]) -> dict:
+    """
+    Fallback for get_signal_counts_by_provider: run the per-provider
+    total/ACTIVE count queries concurrently (bounded by run_query).
+
+    Returns a dict of provider_id -> (total_signals, active_signals).
+    """
+    totals = asyncio.gather(*(run_query(get_provider_signals_count, sb, pid) for pid in provider_ids))
+    actives = asyncio.gather(*(run_query(get_provider_signals_count, sb, pid, "ACTIVE") for pid in provider_ids))
+    total_counts, active_counts = await asyncio.gather(totals, actives)
+    return dict(zip(provider_ids, zip(total_counts, active_counts)))
+
+
 def calculate_provider_stats(sb, provider_id: str) -> dict:
     """Calculate performance statistics for a provider."""
     try:
-        # Fetch all closed signals for the provider
-        result = sb.table("canonical_signals").select("*").eq("provider_id", provider_id).in_("status", ["CLOSED", "TP3_HIT", "SL_HIT"]).execute()
-        signals = result.data or []
+        # Fetch every signal for the provider once; all counts derive from it
+        result = sb.table("canonical_signals").select("status,rr_ratio").eq("provider_id", provider_id).execute()
+        rows = result.data or []
+
+        status_counts = Counter(s.get("status") for s in rows)
+        signals = [s for s in rows if s.get("status") in CLOSED_STATUSES]
 
-        total_signals = get_provider_signals_count(sb, provider_id)
-        active_signals = get_provider_signals_count(sb, provider_id, "ACTIVE")
+        total_signals = len(rows)
+        active_signals = status_counts["ACTIVE"]
         closed_signals = len(signals)
-        valid_signals = get_provider_signals_count(sb, provider_id, "VALID")
-        invalid_signals = get_provider_signals_count(sb, provider_id, "INVALID")
+        valid_signals = status_counts["VALID"]
+        invalid_signals = status_counts["INVALID"]
 
         # Calculate win/loss
-        win_count = sum(1 for s in signals if s.get("status") == "TP3_HIT")
-        loss_count = sum(1 for s in signals if s.get("status") == "SL_HIT")
+        win_count = status_counts["TP3_HIT"]
+        loss_count = status_counts["SL_HIT"]
         win_rate = (win_count / closed_signals * 100) if closed_signals > 0 else 0.0
 
-        # Calculate R-value
+        # R-value, average RR and largest win in one pass over closed signals
         total_r_value = 0.0
+        sum_rr = 0.0
+        largest_win = None
         for signal in signals:
             rr = signal.get("rr_ratio", 1.0)
-            if signal.get("status") == "TP3_HIT":
+            sum_rr += rr
+            status = signal.get("status")
+            if status == "TP3_HIT":
                 total_r_value += rr
-            elif signal.get("status") == "SL_HIT":
+                if largest_win is None or rr > largest_win:
+                    largest_win = rr
+            elif status == "SL_HIT":
                 total_r_value -= 1.0
 
-        avg_rr_ratio = sum(s.get("rr_ratio", 1.0) for s in signals) / closed_signals if closed_signals > 0 else 0.0
+        avg_rr_ratio = sum_rr / closed_signals if closed_signals > 0 else 0.0
 
-        # Largest win/loss
-        largest_win = max((s.get("rr_ratio", 0.0) for s in signals if s.get("status") == "TP3_HIT"), default=None)
         largest_loss = 1.0 if loss_count > 0 else None
 
         return {
@@ -216,6 +280,7 @@ async def create_provider(req: CreateProviderRequest):
             raise Exception("Failed to insert provider")
 
         provider = result.data[0]
+        invalidate_provider_cache()
 
         logger.info(f"Provider created: {provider['id']} | {req.name}")
 
@@ -256,10 +321,21 @@ async def list_providers(
 
         result = query.order("created_at", desc=True).execute()
 
+        rows = result.data or []
+
+        # One grouped query for all providers instead of two counts per provider
+        signal_counts = get_signal_counts_by_provider(sb)
+        if signal_counts is not None:
+            totals = {
+                pid: (sum(status_counts.values()), status_counts.get("ACTIVE", 0))
+                for pid, status_counts in signal_counts.items()
+            }
+        else:
+            totals = await count_signals_concurrently(sb, [p["id"] for p in rows])
+
         providers = []
-        for p in (result.data or []):
-            total_signals = get_provider_signals_count(sb, p["id"])
-            active_signals = get_provider_signals_count(sb, p["id"], "ACTIVE")
+        for p in rows:
+            total_signals, active_signals = totals.get(p["id"], (0, 0))
 
             providers.append(ProviderResponse(
                 id=p["id"],
@@ -298,13 +374,7 @@ async def get_provider(provider_id: str):
 
         provider = result.data[0]
 
-        # Get counts
-        total_signals = get_provider_signals_count(sb, provider_id)
-        active_signals = get_provider_signals_count(sb, provider_id, "ACTIVE")
-        valid_signals = get_provider_signals_count(sb, provider_id, "VALID")
-        invalid_signals = get_provider_signals_count(sb, provider_id, "INVALID")
-
-        # Calculate stats
+        # Calculate stats (includes the per-status counts)
         stats = calculate_provider_stats(sb, provider_id)
 
         return ProviderDetailResponse(
@@ -314,10 +384,10 @@ async def get_provider(provider_id: str):
             is_active=provider["is_active"],
             created_at=provider["created_at"],
             updated_at=provider.get("updated_at"),
-            total_signals=total_signals,
-            active_signals=active_signals,
-            total_valid_signals=valid_signals,
-            total_invalid_signals=invalid_signals,
+            total_signals=stats.get("total_signals", 0),
+            active_signals=stats.get("active_signals", 0),
+            total_valid_signals=stats.get("valid_signals", 0),
+            total_invalid_signals=stats.get("invalid_signals", 0),
             closed_signals=stats.get("closed_signals", 0),
             win_rate=stats.get("win_rate", 0.0),
             avg_rr_ratio=stats.get("avg_rr_ratio", 0.0),
@@ -3,18 +3,35 @@ Performance Reports and Analytics Endpoints.
 Provides trading performance metrics, equity curves, and leaderboards.
 """
 
+import asyncio
+import heapq
 import logging
+from collections import defaultdict
+from operator import itemgetter
 from datetime import datetime, timezone, timedelta
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-from app.database import get_supabase
-from app.engine.outcome_resolver import OutcomeResolver
+from app.cache import TTLCache
+from app.database import get_supabase, is_missing_function, run_query
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1", tags=["reports"])
 
+# Statuses that represent a resolved (closed) signal
+CLOSED_STATUSES = ["CLOSED", "TP1_HIT", "TP2_HIT", "TP3_HIT", "SL_HIT"]
+
+# Leaderboard responses keyed by (days, limit), plus the builds currently
+# running for each key so concurrent misses don't recompute the same entry
+_leaderboard_cache = TTLCache(ttl_seconds=60, maxsize=32)
+_leaderboard_inflight: dict = {}
+
+# Cleared once PostgREST reports the `leaderboard` function missing, so
+# later requests go straight to the Python fallback
+_leaderboard_rpc_available = True
+
 
 # ============================================================================
 # Response Models
@@ -90,55 +107,57 @@ class PerformanceReportResponse(BaseModel):
 # ============================================================================
 
 def get_provider_closed_signals(sb, provider_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> list:
-    """Fetch closed signals for a provider."""
+    """Fetch closed signals for a provider, ordered by closed_at."""
     try:
-        query = sb.table("canonical_signals").select("*").eq("provider_id", provider_id)
+        query = sb.table("canonical_signals").select("status,rr_ratio,closed_at").eq("provider_id", provider_id)
 
         # Filter to closed signals
-        query = query.in_("status", ["CLOSED", "TP1_HIT", "TP2_HIT", "TP3_HIT", "SL_HIT"])
+        query = query.in_("status", CLOSED_STATUSES)
 
         if start_date:
             query = query.gte("closed_at", start_date)
         if end_date:
             query = query.lte("closed_at", end_date)
 
-        result = query.execute()
+        result = query.order("closed_at").execute()
         return result.data or []
     except Exception as e:
         logger.error(f"Failed to fetch closed signals for provider {provider_id}: {e}")
         return []
 
 
-def calculate_consecutive_streaks(signals: list) -> tuple:
-    """Calculate consecutive wins and losses from a list of signals."""
-    if not signals:
-        return 0, 0
+def get_closed_signals_by_provider(sb, start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
+    """
+    Fetch closed signals for all providers in one query, grouped by provider_id.
 
-    # Sort by closed_at
-    sorted_signals = sorted(signals, key=lambda s: s.get("closed_at", ""))
+    Each provider's list keeps the query order (closed_at ascending).
+    """
+    grouped = defaultdict(list)
+    try:
+        query = sb.table("canonical_signals").select("provider_id,status,rr_ratio,closed_at")
+        query = query.in_("status", CLOSED_STATUSES)
 
-    consecutive_wins = 0
-    consecutive_losses = 0
-    current_win_streak = 0
-    current_loss_streak = 0
+        if start_date:
+            query = query.gte("closed_at", start_date)
+        if end_date:
+            query = query.lte("closed_at", end_date)
 
-    for signal in sorted_signals:
-        status = signal.get("status")
-        if status == "TP3_HIT":
-            current_win_streak += 1
-            current_loss_streak = 0
-            consecutive_wins = max(consecutive_wins, current_win_streak)
-        elif status == "SL_HIT":
-            current_loss_streak += 1
-            current_win_streak = 0
-            consecutive_losses = max(consecutive_losses, current_loss_streak)
+        result = query.order("closed_at").execute()
+        for signal in (result.data or []):
+            grouped[signal["provider_id"]].append(signal)
+    except Exception as e:
+        logger.error(f"Failed to fetch closed signals: {e}")
+    return grouped
 
-    return consecutive_wins, consecutive_losses
 
+def calculate_performance_metrics(sorted_signals: list) -> dict:
+    """
+    Calculate performance metrics from a list of closed signals.
 
-def calculate_performance_metrics(signals: list) -> dict:
-    """Calculate performance metrics from a list of closed signals."""
-    if not signals:
+    `sorted_signals` must already be ordered by closed_at; every metric,
+    including win/loss streaks, is computed in a single pass.
+    """
+    if not sorted_signals:
         return {
             "total_trades": 0,
             "closed_trades": 0,
@@ -156,30 +175,48 @@ def calculate_performance_metrics(signals: list) -> dict:
             "expectancy_per_trade": 0.0,
         }
 
-    closed_trades = len(signals)
-    winning_trades = sum(1 for s in signals if s.get("status") == "TP3_HIT")
-    losing_trades = sum(1 for s in signals if s.get("status") == "SL_HIT")
-
-    win_rate = (winning_trades / closed_trades * 100) if closed_trades > 0 else 0.0
-    loss_rate = 100.0 - win_rate
-
-    # Calculate R-value
+    closed_trades = len(sorted_signals)
+    winning_trades = 0
+    losing_trades = 0
     total_r_value = 0.0
-    for signal in signals:
+    sum_rr = 0.0
+    sum_wins = 0.0
+    largest_win = 0.0
+    consecutive_wins = 0
+    consecutive_losses = 0
+    current_win_streak = 0
+    current_loss_streak = 0
+
+    # Single pass over the signals for counts, R-values and streaks
+    for signal in sorted_signals:
+        status = signal.get("status")
         rr = signal.get("rr_ratio", 1.0)
-        if signal.get("status") == "TP3_HIT":
+        sum_rr += rr
+
+        if status == "TP3_HIT":
+            winning_trades += 1
             total_r_value += rr
-        elif signal.get("status") == "SL_HIT":
+            sum_wins += rr
+            if rr > largest_win:
+                largest_win = rr
+            current_win_streak += 1
+            current_loss_streak = 0
+            if current_win_streak > consecutive_wins:
+                consecutive_wins = current_win_streak
+        elif status == "SL_HIT":
+            losing_trades += 1
             total_r_value -= 1.0
+            current_loss_streak += 1
+            current_win_streak = 0
+            if current_loss_streak > consecutive_losses:
+                consecutive_losses = current_loss_streak
 
-    avg_rr_ratio = sum(s.get("rr_ratio", 1.0) for s in signals) / closed_trades if closed_trades > 0 else 0.0
-
-    largest_win = max((s.get("rr_ratio", 0.0) for s in signals if s.get("status") == "TP3_HIT"), default=0.0)
+    win_rate = (winning_trades / closed_trades * 100) if closed_trades > 0 else 0.0
+    loss_rate = 100.0 - win_rate
 
-    consecutive_wins, consecutive_losses = calculate_consecutive_streaks(signals)
+    avg_rr_ratio = sum_rr / closed_trades if closed_trades > 0 else 0.0
 
     # Profit factor: sum of wins / sum of losses
-    sum_wins = sum(s.get("rr_ratio", 0.0) for s in signals if s.get("status") == "TP3_HIT")
     sum_losses = losing_trades * 1.0  # Each loss is -1R
     profit_factor = (sum_wins / sum_losses) if sum_losses > 0 else 0.0
 
@@ -204,42 +241,64 @@ def calculate_performance_metrics(signals: list) -> dict:
     }
 
 
-def build_equity_curve(signals: list, provider_name: str) -> dict:
-    """Build equity curve from closed signals."""
-    if not signals:
-        return {
-            "provider_name": provider_name,
-            "points": [],
-            "start_date": None,
-            "end_date": None,
-        }
-
-    # Sort by closed_at
-    sorted_signals = sorted(signals, key=lambda s: s.get("closed_at", ""))
+def _equity_series(signals: list) -> tuple:
+    """
+    Reduce sorted closed signals to parallel equity-curve columns.
 
-    points = []
+    Returns (cumulative_r, win_counts, loss_counts) lists, one entry per signal.
+    """
+    cumulative_r_values = []
+    win_counts = []
+    loss_counts = []
     cumulative_r = 0.0
     win_count = 0
     loss_count = 0
 
-    for signal in sorted_signals:
+    for signal in signals:
         status = signal.get("status")
-        rr = signal.get("rr_ratio", 1.0)
 
         if status == "TP3_HIT":
-            cumulative_r += rr
+            cumulative_r += signal.get("rr_ratio", 1.0)
             win_count += 1
         elif status == "SL_HIT":
             cumulative_r -= 1.0
             loss_count += 1
 
-        points.append(EquityCurvePoint(
-            timestamp=signal.get("closed_at", ""),
-            cumulative_r_value=round(cumulative_r, 2),
-            trade_count=win_count + loss_count,
-            win_count=win_count,
-            loss_count=loss_count,
-        ))
+        cumulative_r_values.append(round(cumulative_r, 2))
+        win_counts.append(win_count)
+        loss_counts.append(loss_count)
+
+    return cumulative_r_values, win_counts, loss_counts
+
+
+def build_equity_curve(sorted_signals: list, provider_name: str) -> dict:
+    """
+    Build equity curve from closed signals.
+
+    `sorted_signals` must already be ordered by closed_at.
+    """
+    if not sorted_signals:
+        return {
+            "provider_name": provider_name,
+            "points": [],
+            "start_date": None,
+            "end_date": None,
+        }
+
+    # Numeric reduction first, then build the response models
+    cumulative_r_values, win_counts, loss_counts = _equity_series(sorted_signals)
+
+    # Plain dicts shaped like EquityCurvePoint, serialized directly by orjson
+    points = [
+        {
+            "timestamp": signal.get("closed_at", ""),
+            "cumulative_r_value": cumulative_r,
+            "trade_count": wins + losses,
+            "win_count": wins,
+            "loss_count": losses,
+        }
+        for signal, cumulative_r, wins, losses in zip(sorted_signals, cumulative_r_values, win_counts, loss_counts)
+    ]
 
     return {
         "provider_name": provider_name,
@@ -249,6 +308,105 @@ def build_equity_curve(signals: list, provider_name: str) -> dict:
     }
 
 
+def get_leaderboard_rows(sb, days: int, limit: int) -> Optional[list]:
+    """
+    Fetch ranked leaderboard rows from the `leaderboard` Postgres function.
+
+    Returns None if the function is not deployed so callers can fall back
+    to computing the leaderboard in Python; any other error propagates.
+    """
+    global _leaderboard_rpc_available
+    if not _leaderboard_rpc_available:
+        return None
+    try:
+        result = sb.rpc("leaderboard", {"days": days, "lim": limit}).execute()
+        return result.data or []
+    except Exception as e:
+        if not is_missing_function(e):
+            raise
+        logger.warning(f"Leaderboard RPC not deployed, computing in Python: {e}")
+        _leaderboard_rpc_available = False
+        return None
+
+
+def compute_leaderboard_rows(sb, days: int, limit: int) -> list:
+    """Compute ranked leaderboard rows in Python from closed signals."""
+    # Calculate date range
+    end_date = datetime.now(timezone.utc).isoformat()
+    start_date = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+    # Fetch all providers
+    providers_result = sb.table("providers").select("*").eq("is_active", True).execute()
+    providers = providers_result.data or []
+
+    # Fetch closed signals for every provider in one query
+    signals_by_provider = get_closed_signals_by_provider(sb, start_date, end_date)
+
+    # Calculate metrics only for providers that closed trades in the window
+    leaderboard_data = []
+
+    for provider in providers:
+        signals = signals_by_provider.get(provider["id"])
+        if not signals:
+            continue
+
+        metrics = calculate_performance_metrics(signals)
+
+        if metrics["closed_trades"] > 0:  # Only include providers with trades
+            leaderboard_data.append({
+                "provider_id": provider["id"],
+                "provider_name": provider["name"],
+                "total_trades": metrics["closed_trades"],
+                "win_rate": metrics["win_rate"],
+                "total_r_value": metrics["total_r_value"],
+                "expectancy": metrics["expectancy_per_trade"],
+            })
+
+    # Top `limit` rows by total_r_value, without sorting the whole list
+    return heapq.nlargest(limit, leaderboard_data, key=itemgetter("total_r_value"))
+
+
+def _build_leaderboard(days: int, limit: int) -> LeaderboardResponse:
+    """Compute the leaderboard response (uncached)."""
+    sb = get_supabase()
+
+    try:
+        leaderboard_data = get_leaderboard_rows(sb, days, limit)
+        if leaderboard_data is None:
+            leaderboard_data = compute_leaderboard_rows(sb, days, limit)
+
+        # Add ranks (rows are built internally, so skip validation)
+        entries = [
+            ProviderLeaderboardEntry.model_construct(
+                rank=i + 1,
+                provider_id=entry["provider_id"],
+                provider_name=entry["provider_name"],
+                total_trades=entry["total_trades"],
+                win_rate=entry["win_rate"],
+                total_r_value=entry["total_r_value"],
+                expectancy=entry["expectancy"],
+                sharpe_ratio=None,
+            )
+            for i, entry in enumerate(leaderboard_data)
+        ]
+
+        return LeaderboardResponse(
+            period=f"Last {days} days",
+            entries=entries,
+        )
+    except Exception as e:
+        logger.error(f"Failed to generate leaderboard: {e}")
+        raise HTTPException(500, "Failed to generate leaderboard")
+
+
+async def _refresh_leaderboard(days: int, limit: int) -> LeaderboardResponse:
+    """Build the leaderboard off the event loop and cache it."""
+    # The build makes blocking supabase calls; keep them off the event loop
+    response = await run_query(_build_leaderboard, days, limit)
+    _leaderboard_cache.set((days, limit), response)
+    return response
+
+
 # ============================================================================
 # Endpoints
 # ============================================================================
@@ -284,7 +442,7 @@ async def get_performance_report(
         end_date = datetime.now(timezone.utc).isoformat()
         start_date = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
-        # Fetch closed signals
+        # Fetch closed signals (already ordered by closed_at)
         signals = get_provider_closed_signals(sb, provider_id, start_date, end_date)
 
         # Calculate metrics
@@ -336,16 +494,17 @@ async def get_equity_curve(
         end_date = datetime.now(timezone.utc).isoformat()
         start_date = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
-        # Fetch closed signals
+        # Fetch closed signals (already ordered by closed_at)
         signals = get_provider_closed_signals(sb, provider_id, start_date, end_date)
 
         # Build equity curve
         curve_data = build_equity_curve(signals, provider["name"])
 
-        return EquityCurveResponse(
-            provider_id=provider_id,
+        # Points are already plain dicts; skip pydantic serialization
+        return ORJSONResponse({
+            "provider_id": provider_id,
             **curve_data,
-        )
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -367,59 +526,20 @@ async def get_leaderboard(
 
     Returns ranked list of providers by total R-value (expectancy).
     """
-    sb = get_supabase()
-
-    try:
-        # Calculate date range
-        end_date = datetime.now(timezone.utc).isoformat()
-        start_date = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
-
-        # Fetch all providers
-        providers_result = sb.table("providers").select("*").eq("is_active", True).execute()
-        providers = providers_result.data or []
-
-        # Calculate metrics for each provider
-        leaderboard_data = []
-
-        for provider in providers:
-            signals = get_provider_closed_signals(sb, provider["id"], start_date, end_date)
-            metrics = calculate_performance_metrics(signals)
-
-            if metrics["closed_trades"] > 0:  # Only include providers with trades
-                leaderboard_data.append({
-                    "provider_id": provider["id"],
-                    "provider_name": provider["name"],
-                    "total_trades": metrics["closed_trades"],
-                    "win_rate": metrics["win_rate"],
-                    "total_r_value": metrics["total_r_value"],
-                    "expectancy": metrics["expectancy_per_trade"],
-                })
-
-        # Sort by total_r_value descending
-        leaderboard_data.sort(key=lambda x: x["total_r_value"], reverse=True)
-
-        # Apply limit
-        leaderboard_data = leaderboard_data[:limit]
-
-        # Add ranks
-        entries = [
-            ProviderLeaderboardEntry(
-                rank=i + 1,
-                provider_id=entry["provider_id"],
-                provider_name=entry["provider_name"],
-                total_trades=entry["total_trades"],
-                win_rate=entry["win_rate"],
-                total_r_value=entry["total_r_value"],
-                expectancy=entry["expectancy"],
-                sharpe_ratio=None,  # TODO: calculate sharpe ratio
-            )
-            for i, entry in enumerate(leaderboard_data)
-        ]
-
-        return LeaderboardResponse(
-            period=f"Last {days} days",
-            entries=entries,
-        )
-    except Exception as e:
-        logger.error(f"Failed to generate leaderboard: {e}")
-        raise HTTPException(500, "Failed to generate leaderboard")
+    cache_key = (days, limit)
+    cached = _leaderboard_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Concurrent misses for the same key await one build; other keys are
+    # not held up. Tasks belong to a loop, so the loop is part of the key.
+    loop = asyncio.get_running_loop()
+    inflight_key = (loop, cache_key)
+    task = _leaderboard_inflight.get(inflight_key)
+    if task is None:
+        task = loop.create_task(_refresh_leaderboard(days, limit))
+        _leaderboard_inflight[inflight_key] = task
+        task.add_done_callback(lambda _: _leaderboard_inflight.pop(inflight_key, None))
+
+    # Shielded so a disconnecting client doesn't cancel the shared build
+    return await asyncio.shield(task)
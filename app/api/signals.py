@@ -3,17 +3,35 @@ Signal Query and Management Endpoints.
 Provides REST API for listing, filtering, and managing canonical signals.
 """
 
+import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-from app.database import get_supabase
+from app.cache import TTLCache
+from app.database import get_supabase, sb_exec
 from app.models.canonical_signal import SignalStatus
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/api/v1", tags=["signals"])
+router = APIRouter(prefix="/api/v1", tags=["signals"], default_response_class=ORJSONResponse)
+
+# Statuses for signals that are still open
+ACTIVE_STATUSES = ["PENDING", "ACTIVE", "TP1_HIT", "TP2_HIT", "TP3_HIT"]
+
+# Columns read by the list endpoints (keeps raw_payload etc. off the wire)
+LIST_COLUMNS = "id,symbol,direction,entry_price,sl,tp1,status,entry_time,rr_ratio"
+
+# Columns read for signal events
+EVENT_COLUMNS = "signal_id,event_type,price,source,event_time,metadata"
+
+# Short-lived read caches, invalidated on writes. Detail responses are
+# keyed by signal_id, each holding {(events_limit, events_offset): detail},
+# so a write drops only the signal it touched.
+_detail_cache = TTLCache(ttl_seconds=5, maxsize=10_000)
+_list_cache = TTLCache(ttl_seconds=5, maxsize=1024)
 
 
 # ============================================================================
@@ -78,6 +96,41 @@ class SignalListResult(BaseModel):
     items: List[SignalListResponse]
 
 
+class SignalEventListResult(BaseModel):
+    """Paginated signal event history."""
+    total: int
+    limit: int
+    offset: int
+    items: List[SignalEventResponse]
+
+
+# ============================================================================
+# Helper Functions
+# ============================================================================
+
+def event_to_dict(event: dict) -> dict:
+    """Shape a signal_events row as a SignalEventResponse payload."""
+    return {
+        "signal_id": event["signal_id"],
+        "event_type": event["event_type"],
+        "price": event.get("price"),
+        "source": event.get("source", "UNKNOWN"),
+        "event_time": event["event_time"],
+        "metadata": event.get("metadata"),
+    }
+
+
+def invalidate_signal_lists() -> None:
+    """Drop cached list responses after a new signal is stored."""
+    _list_cache.clear()
+
+
+def invalidate_signal(signal_id: str) -> None:
+    """Drop one signal's cached detail pages, and the lists its status appears in."""
+    _detail_cache.pop(signal_id)
+    _list_cache.clear()
+
+
 # ============================================================================
 # Endpoints
 # ============================================================================
@@ -102,11 +155,17 @@ async def list_signals(
 
     Returns paginated list of signals.
     """
+    cache_key = ("all", provider_id, symbol, status, limit, offset)
+    cached = _list_cache.get(cache_key)
+    if cached is not None:
+        return ORJSONResponse(cached)
+
     sb = get_supabase()
 
     try:
-        # Build query
-        query = sb.table("canonical_signals").select("*")
+        # Build query once; count="exact" returns the total matching rows
+        # alongside the requested page, so only `limit` rows are transferred
+        query = sb.table("canonical_signals").select(LIST_COLUMNS, count="exact")
 
         if provider_id:
             query = query.eq("provider_id", provider_id)
@@ -115,107 +174,103 @@ async def list_signals(
         if status:
             query = query.eq("status", status)
 
-        # Get total count
-        count_result = query.execute()
-        total = len(count_result.data) if count_result.data else 0
-
-        # Apply pagination
-        query = sb.table("canonical_signals").select("*")
-        if provider_id:
-            query = query.eq("provider_id", provider_id)
-        if symbol:
-            query = query.eq("symbol", symbol)
-        if status:
-            query = query.eq("status", status)
+        result = await sb_exec(query.order("entry_time", desc=True).range(offset, offset + limit - 1))
+        total = result.count or 0
 
-        result = query.order("entry_time", desc=True).range(offset, offset + limit - 1).execute()
-
-        items = [
-            SignalListResponse(
-                id=sig["id"],
-                symbol=sig["symbol"],
-                direction=sig["direction"],
-                entry_price=sig["entry_price"],
-                sl=sig["sl"],
-                tp1=sig["tp1"],
-                status=sig["status"],
-                entry_time=sig["entry_time"],
-                rr_ratio=sig.get("rr_ratio"),
-            )
-            for sig in result.data
-        ]
-
-        return SignalListResult(
-            total=total,
-            limit=limit,
-            offset=offset,
-            items=items,
-        )
+        # Rows are projected to LIST_COLUMNS and already match
+        # SignalListResponse; serialize them as-is
+        payload = {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "items": result.data or [],
+        }
+        _list_cache.set(cache_key, payload)
+        return ORJSONResponse(payload)
     except Exception as e:
         logger.error(f"Failed to list signals: {e}")
         raise HTTPException(500, "Failed to list signals")
 
 
 @router.get("/signals/{signal_id}", response_model=SignalDetailResponse)
-async def get_signal(signal_id: str):
+async def get_signal(
+    signal_id: str,
+    events_limit: int = Query(100, ge=1, le=1000),
+    events_offset: int = Query(0, ge=0),
+):
     """
-    Get detailed signal information including full event history.
+    Get detailed signal information including its event history.
 
     Path Parameters:
     - signal_id: The signal ID
 
-    Returns complete signal details with all associated events.
+    Query Parameters:
+    - events_limit: Number of events to embed (1-1000, default 100)
+    - events_offset: Event pagination offset (default 0)
+
+    Returns signal details with one page of associated events, newest first,
+    so the default page holds the latest activity. Use
+    GET /signals/{signal_id}/events to page through long histories.
     """
+    page_key = (events_limit, events_offset)
+    pages = _detail_cache.get(signal_id)
+    cached = pages.get(page_key) if pages is not None else None
+    if cached is not None:
+        return ORJSONResponse(cached)
+
     sb = get_supabase()
 
     try:
-        # Fetch signal
-        result = sb.table("canonical_signals").select("*").eq("id", signal_id).execute()
+        # Fetch signal and events concurrently (supabase-py is sync, so each
+        # query runs in a worker thread)
+        result, events_result = await asyncio.gather(
+            sb_exec(sb.table("canonical_signals").select("*").eq("id", signal_id)),
+            sb_exec(
+                sb.table("signal_events").select(EVENT_COLUMNS).eq("signal_id", signal_id)
+                .order("event_time", desc=True).range(events_offset, events_offset + events_limit - 1)
+            ),
+        )
         if not result.data:
             raise HTTPException(404, f"Signal not found: {signal_id}")
 
         signal = result.data[0]
 
-        # Fetch events
-        events_result = sb.table("signal_events").select("*").eq("signal_id", signal_id).order("event_time").execute()
-
-        events = [
-            SignalEventResponse(
-                signal_id=event["signal_id"],
-                event_type=event["event_type"],
-                price=event.get("price"),
-                source=event.get("source", "UNKNOWN"),
-                event_time=event["event_time"],
-                metadata=event.get("metadata"),
-            )
-            for event in (events_result.data or [])
-        ]
-
-        return SignalDetailResponse(
-            id=signal["id"],
-            provider_id=signal["provider_id"],
-            symbol=signal["symbol"],
-            asset_class=signal.get("asset_class", "UNKNOWN"),
-            direction=signal["direction"],
-            entry_price=signal["entry_price"],
-            sl=signal["sl"],
-            tp1=signal["tp1"],
-            tp2=signal.get("tp2"),
-            tp3=signal.get("tp3"),
-            status=signal["status"],
-            entry_time=signal["entry_time"],
-            activated_at=signal.get("activated_at"),
-            closed_at=signal.get("closed_at"),
-            close_reason=signal.get("close_reason"),
-            exit_price=signal.get("exit_price"),
-            rr_ratio=signal.get("rr_ratio"),
-            risk_distance=signal.get("risk_distance"),
-            strategy_name=signal.get("strategy_name"),
-            external_signal_id=signal.get("external_signal_id"),
-            validation_warnings=signal.get("validation_warnings"),
-            validation_errors=signal.get("validation_errors"),
-            events=events,
-        )
+        events = [event_to_dict(event) for event in (events_result.data or [])]
+
+        # DB rows are already in response shape; skip pydantic serialization
+        detail = {
+            "id": signal["id"],
+            "provider_id": signal["provider_id"],
+            "symbol": signal["symbol"],
+            "asset_class": signal.get("asset_class", "UNKNOWN"),
+            "direction": signal["direction"],
+            "entry_price": signal["entry_price"],
+            "sl": signal["sl"],
+            "tp1": signal["tp1"],
+            "tp2": signal.get("tp2"),
+            "tp3": signal.get("tp3"),
+            "status": signal["status"],
+            "entry_time": signal["entry_time"],
+            "activated_at": signal.get("activated_at"),
+            "closed_at": signal.get("closed_at"),
+            "close_reason": signal.get("close_reason"),
+            "exit_price": signal.get("exit_price"),
+            "rr_ratio": signal.get("rr_ratio"),
+            "risk_distance": signal.get("risk_distance"),
+            "strategy_name": signal.get("strategy_name"),
+            "external_signal_id": signal.get("external_signal_id"),
+            "validation_warnings": signal.get("validation_warnings"),
+            "validation_errors": signal.get("validation_errors"),
+            "events": events,
+        }
+        # Further pages join the signal's existing entry (and its expiry)
+        # rather than refreshing the TTL of pages cached earlier
+        pages = _detail_cache.get(signal_id)
+        if pages is None:
+            _detail_cache.set(signal_id, {page_key: detail})
+        else:
+            pages[page_key] = detail
+        return ORJSONResponse(detail)
     except HTTPException:
         raise
     except Exception as e:
@@ -223,6 +278,44 @@ async def get_signal(signal_id: str):
         raise HTTPException(500, "Failed to retrieve signal")
 
 
+@router.get("/signals/{signal_id}/events", response_model=SignalEventListResult)
+async def list_signal_events(
+    signal_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Page through a signal's event history, oldest first.
+
+    Path Parameters:
+    - signal_id: The signal ID
+
+    Query Parameters:
+    - limit: Number of events (1-1000, default 100)
+    - offset: Pagination offset (default 0)
+    """
+    sb = get_supabase()
+
+    try:
+        result = await sb_exec(
+            sb.table("signal_events")
+            .select(EVENT_COLUMNS, count="exact")
+            .eq("signal_id", signal_id)
+            .order("event_time")
+            .range(offset, offset + limit - 1)
+        )
+
+        return ORJSONResponse({
+            "total": result.count or 0,
+            "limit": limit,
+            "offset": offset,
+            "items": [event_to_dict(event) for event in (result.data or [])],
+        })
+    except Exception as e:
+        logger.error(f"Failed to list events for signal {signal_id}: {e}")
+        raise HTTPException(500, "Failed to list signal events")
+
+
 @router.get("/signals/active/list", response_model=SignalListResult)
 async def list_active_signals(
     provider_id: Optional[str] = Query(None),
@@ -243,54 +336,35 @@ async def list_active_signals(
 
     Returns paginated list of active signals.
     """
+    cache_key = ("active", provider_id, symbol, None, limit, offset)
+    cached = _list_cache.get(cache_key)
+    if cached is not None:
+        return ORJSONResponse(cached)
+
     sb = get_supabase()
 
     try:
-        active_statuses = ["PENDING", "ACTIVE", "TP1_HIT", "TP2_HIT", "TP3_HIT"]
-
-        # Build query
-        query = sb.table("canonical_signals").select("*")
+        # Filter, count and paginate in the database
+        query = sb.table("canonical_signals").select(LIST_COLUMNS, count="exact").in_("status", ACTIVE_STATUSES)
 
         if provider_id:
             query = query.eq("provider_id", provider_id)
         if symbol:
             query = query.eq("symbol", symbol)
 
-        # Filter by active statuses
-        for status in active_statuses:
-            query = query.or_(f"status.eq.{status}")
-
-        result = query.execute()
-        all_data = result.data or []
-
-        # Filter to active statuses in memory (since Supabase OR might be complex)
-        filtered = [s for s in all_data if s["status"] in active_statuses]
-        total = len(filtered)
-
-        # Apply pagination
-        paginated = filtered[offset : offset + limit]
-
-        items = [
-            SignalListResponse(
-                id=sig["id"],
-                symbol=sig["symbol"],
-                direction=sig["direction"],
-                entry_price=sig["entry_price"],
-                sl=sig["sl"],
-                tp1=sig["tp1"],
-                status=sig["status"],
-                entry_time=sig["entry_time"],
-                rr_ratio=sig.get("rr_ratio"),
-            )
-            for sig in paginated
-        ]
-
-        return SignalListResult(
-            total=total,
-            limit=limit,
-            offset=offset,
-            items=items,
-        )
+        result = await sb_exec(query.order("entry_time", desc=True).range(offset, offset + limit - 1))
+        total = result.count or 0
+
+        # Rows are projected to LIST_COLUMNS and already match
+        # SignalListResponse; serialize them as-is
+        payload = {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "items": result.data or [],
+        }
+        _list_cache.set(cache_key, payload)
+        return ORJSONResponse(payload)
     except Exception as e:
         logger.error(f"Failed to list active signals: {e}")
         raise HTTPException(500, "Failed to list active signals")
@@ -309,33 +383,31 @@ async def close_signal(signal_id: str):
     sb = get_supabase()
 
     try:
-        # Verify signal exists
-        result = sb.table("canonical_signals").select("*").eq("id", signal_id).execute()
-        if not result.data:
-            raise HTTPException(404, f"Signal not found: {signal_id}")
-
-        signal = result.data[0]
-
-        # Already closed?
-        if signal["status"] == "CLOSED":
-            raise HTTPException(400, "Signal is already closed")
-
-        # Update signal
+        # Close in one conditional UPDATE; the WHERE clause enforces both
+        # existence and "not already closed"
         closed_at = datetime.now(timezone.utc).isoformat()
-        sb.table("canonical_signals").update({
+        result = await sb_exec(sb.table("canonical_signals").update({
             "status": "CLOSED",
             "closed_at": closed_at,
             "close_reason": "MANUAL_CLOSE",
-        }).eq("id", signal_id).execute()
+        }).eq("id", signal_id).neq("status", "CLOSED"))
+
+        if not result.data:
+            # Nothing updated: tell a missing signal from an already closed one
+            existing = await sb_exec(sb.table("canonical_signals").select("status").eq("id", signal_id))
+            if not existing.data:
+                raise HTTPException(404, f"Signal not found: {signal_id}")
+            raise HTTPException(400, "Signal is already closed")
 
         # Create event
-        sb.table("signal_events").insert({
+        await sb_exec(sb.table("signal_events").insert({
             "signal_id": signal_id,
             "event_type": "MANUAL_CLOSE",
             "source": "API",
             "event_time": closed_at,
-        }).execute()
+        }, returning="minimal"))
 
+        invalidate_signal(signal_id)
         logger.info(f"Signal manually closed: {signal_id}")
 
         return {
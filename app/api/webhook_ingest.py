@@ -3,14 +3,20 @@ Webhook Ingestion API.
 Receives signals from TradingView and PineScript, normalizes, validates, and stores them.
 """
 
+import asyncio
 import hmac
-import hashlib
 import logging
+import re
+import orjson
+from functools import lru_cache
 from datetime import datetime, timezone
-from fastapi import APIRouter, Request, HTTPException, Header
-from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Request, HTTPException, Header
+from pydantic import TypeAdapter, ValidationError
+from typing import List, Optional
 
-from app.database import get_supabase
+from app.database import get_supabase, is_missing_function, sb_exec
+from app.api.providers import hash_key, providers_by_api_key, providers_by_name, default_provider
+from app.api.signals import invalidate_signal, invalidate_signal_lists
 from app.models.webhook_schemas import TradingViewWebhook, PineScriptEvent
 from app.models.canonical_signal import ValidationResult, SignalStatus, EventType
 from app.engine.normalizer import SignalNormalizer
@@ -23,11 +29,141 @@ router = APIRouter(prefix="/api/v1", tags=["webhooks"])
 validator = ValidationEngine()
 normalizer = SignalNormalizer()
 
+# Slot in the dedicated default_provider cache
+DEFAULT_PROVIDER_KEY = "default"
+
+# Ingest only needs the provider id (api_key_hash to tell a key match from
+# a name match), so lookups don't pull whole provider rows
+PROVIDER_LOOKUP_COLUMNS = "id,name,api_key_hash"
+
+# Upper bound on events per PineScript batch request
+MAX_PINESCRIPT_BATCH = 500
+# Signal ids per id=in.(...) lookup; 100 UUIDs keep the PostgREST query
+# string under ~4 KB, inside the 8 KB URL cap common to proxies/gateways
+SIGNAL_ID_LOOKUP_CHUNK = 100
+_pinescript_batch_adapter = TypeAdapter(List[PineScriptEvent])
+
+# Cleared once PostgREST reports insert_signal_with_entry_event missing,
+# so later ingests skip straight to the two-step insert
+_ingest_rpc_available = True
+# Likewise for ensure_default_provider and apply_signal_updates
+_default_provider_rpc_available = True
+_signal_updates_rpc_available = True
+
+# Text alert patterns (compiled once at import). The main fields are one
+# alternation so a single left-to-right scan finds all of them.
+_RE_ALERT_FIELDS = re.compile(
+    r"Symbol[:\s]+(?P<symbol>[A-Za-z0-9!]+)"
+    r"|Entry[:\s]+(?P<entry>[\d.,]+)"
+    r"|Stop\s*Loss[:\s]+(?P<sl>[\d.,]+)"
+    r"|Take\s*Profit\s*(?P<tp_num>\d)?[:\s]+(?P<tp>[\d.,]+)"
+    r"|TP(?P<tp_label>[1-3])[:\s]+(?P<tp_short>[\d.,]+)",
+    re.IGNORECASE,
+)
+_RE_TARGET = re.compile(r"(?:Target|Profit)[:\s]+([\d.,]+)", re.IGNORECASE)
+
+# Line-scan fast path for the one-field-per-line TaskMagic format. Any line
+# mentioning one of the keywords that doesn't fit this shape sends the whole
+# alert back to the regex scan, so both paths always agree.
+_LINE_PREFIXES = (
+    ("symbol", "symbol"),
+    ("entry", "entry"),
+    ("stop loss", "sl"),
+    ("take profit", "tp"),
+)
+_LONGEST_PREFIX = max(len(prefix) for prefix, _ in _LINE_PREFIXES)
+_ALERT_KEYWORDS = ("symbol", "entry", "stop", "loss", "profit", "target", "tp")
+_FIELD_SEPARATORS = ": \t"
+_ASCII_LETTERS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
+_SYMBOL_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789!")
+_NUMBER_CHARS = frozenset("0123456789.,")
+
+
+@lru_cache(maxsize=256)
+def _hmac_template(secret: str) -> hmac.HMAC:
+    """Pre-keyed HMAC-SHA256 object for a secret; copy() it per message."""
+    # A string digestmod keeps HMAC on OpenSSL's native implementation
+    return hmac.new(secret.encode(), digestmod="sha256")
+
 
 def verify_webhook_signature(payload: bytes, signature: str, secret: str) -> bool:
     """Verify HMAC-SHA256 signature from webhook."""
-    expected = hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
-    return hmac.compare_digest(expected, signature)
+    mac = _hmac_template(secret).copy()
+    mac.update(payload)
+    # Compare hex strings so only the canonical lowercase form matches
+    return hmac.compare_digest(mac.hexdigest(), signature)
+
+
+def _num(value: str) -> float:
+    """Parse a price that may contain thousands separators."""
+    return float(value.replace(",", "")) if "," in value else float(value)
+
+
+def _take_run(text: str, chars: frozenset) -> str:
+    """Leading run of `text` made only of `chars`."""
+    for end, ch in enumerate(text):
+        if ch not in chars:
+            return text[:end]
+    return text
+
+
+def _scan_alert_lines(text: str) -> Optional[dict]:
+    """
+    Parse a well-formed alert line by line with prefix checks.
+    Returns None when the text isn't in the simple format (the caller then
+    uses the regex scan).
+    """
+    result = {}
+    tp_index = 0
+    for line in text.splitlines():
+        low = line.lower()
+        if not any(k in low for k in _ALERT_KEYWORDS):
+            continue
+
+        # Skip leading emojis / bullets (indexes into `line`, since lower()
+        # can change the length of non-ASCII text)
+        for start, ch in enumerate(line):
+            if ch in _ASCII_LETTERS:
+                break
+        head = line[start:start + _LONGEST_PREFIX].lower()
+        for prefix, field in _LINE_PREFIXES:
+            if head.startswith(prefix):
+                break
+        else:
+            return None
+
+        rest = line[start + len(prefix):]
+        tp_num = None
+        if field == "tp":
+            numbered = rest.lstrip(" \t")
+            if numbered[:1].isdigit() and not numbered[1:].strip(_FIELD_SEPARATORS):
+                # "Take Profit 1" with the price on a later line
+                return None
+            if numbered[:1].isdigit() and numbered[1:2] in (":", " ", "\t"):
+                tp_num, rest = numbered[0], numbered[1:]
+        value_text = rest.lstrip(_FIELD_SEPARATORS)
+        if len(value_text) == len(rest):
+            return None
+        value = _take_run(value_text, _SYMBOL_CHARS if field == "symbol" else _NUMBER_CHARS)
+        if not value:
+            return None
+        tail = value_text[len(value):].lower()
+        if any(k in tail for k in _ALERT_KEYWORDS):
+            return None
+
+        if field == "tp":
+            result[f"tp{tp_num or tp_index + 1}"] = _num(value)
+            tp_index += 1
+        elif field in result:
+            continue
+        elif field == "symbol":
+            result["symbol"] = value.rstrip("!")
+        else:
+            result[field] = _num(value)
+
+    if "tp1" not in result:
+        return None
+    return result
 
 
 def _parse_text_alert(text: str) -> dict:
@@ -43,63 +179,145 @@ def _parse_text_alert(text: str) -> dict:
         ✅ Take Profit 2: 20350.00
         ✅ Take Profit 3: 20250.00
     """
-    import re
-
     result = {}
 
-    # Direction
-    text_upper = text.upper()
-    if "SELL" in text_upper or "SHORT" in text_upper:
+    # Direction (casefold matches case-insensitively the same way upper() did)
+    folded = text.casefold()
+    if "sell" in folded or "short" in folded:
         result["direction"] = "SHORT"
-    elif "BUY" in text_upper or "LONG" in text_upper:
+    elif "buy" in folded or "long" in folded:
         result["direction"] = "LONG"
 
-    # Symbol — look for "Symbol: NQ1!" or "Symbol: EURUSD"
-    sym_match = re.search(r"Symbol[:\s]+([A-Za-z0-9!]+)", text, re.IGNORECASE)
-    if sym_match:
-        result["symbol"] = sym_match.group(1).strip().rstrip("!")
-
-    # Entry price
-    entry_match = re.search(r"Entry[:\s]+([\d.,]+)", text, re.IGNORECASE)
-    if entry_match:
-        result["entry"] = float(entry_match.group(1).replace(",", ""))
-
-    # Stop Loss
-    sl_match = re.search(r"Stop\s*Loss[:\s]+([\d.,]+)", text, re.IGNORECASE)
-    if sl_match:
-        result["sl"] = float(sl_match.group(1).replace(",", ""))
+    # Common case: one field per line
+    fields = _scan_alert_lines(text)
+    if fields is not None:
+        result.update(fields)
+        return result
+
+    # Symbol, entry, stop loss and take profits in one scan; the first
+    # symbol/entry/stop loss and "TPn:" wins, every take profit is collected
+    tp_matches = []
+    tp_short = {}
+    for m in _RE_ALERT_FIELDS.finditer(text):
+        field = m.lastgroup
+        if field == "tp":
+            tp_matches.append((m.group("tp_num"), m.group("tp")))
+        elif field == "tp_short":
+            tp_short.setdefault(f"tp{m.group('tp_label')}", m.group("tp_short"))
+        elif field == "symbol":
+            if "symbol" not in result:
+                result["symbol"] = m.group("symbol").strip().rstrip("!")
+        elif field not in result:
+            result[field] = _num(m.group(field))
 
     # Take Profits (TP1, TP2, TP3)
-    tp_matches = re.findall(r"Take\s*Profit\s*(\d)?[:\s]+([\d.,]+)", text, re.IGNORECASE)
     if tp_matches:
         for idx, (tp_num, price) in enumerate(tp_matches):
             key = f"tp{tp_num or idx + 1}"
-            result[key] = float(price.replace(",", ""))
+            result[key] = _num(price)
     else:
-        # Try "TP1:", "TP2:", "TP3:" format
-        for i in range(1, 4):
-            tp_match = re.search(rf"TP{i}[:\s]+([\d.,]+)", text, re.IGNORECASE)
-            if tp_match:
-                result[f"tp{i}"] = float(tp_match.group(1).replace(",", ""))
+        # "TP1:", "TP2:", "TP3:" format
+        for key in ("tp1", "tp2", "tp3"):
+            if key in tp_short:
+                result[key] = _num(tp_short[key])
 
     # Target/Profit Target fallback
     if "tp1" not in result:
-        target_matches = re.findall(r"(?:Target|Profit)[:\s]+([\d.,]+)", text, re.IGNORECASE)
+        target_matches = _RE_TARGET.findall(text)
         for i, m in enumerate(target_matches):
-            result[f"tp{i+1}"] = float(m.replace(",", ""))
+            result[f"tp{i+1}"] = _num(m)
 
     return result
 
 
+def _quote_filter_value(value: str) -> str:
+    """Quote a value for use inside a PostgREST or_() filter."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+async def _find_provider(sb, api_key: Optional[str] = None, name: Optional[str] = None) -> Optional[dict]:
+    """
+    Look up an active provider by API key or by name in one query.
+
+    A match on the API key takes precedence over a match on the name.
+    Hits are cached for a few minutes by API key or by name; misses are not.
+    `name` comes straight from the JSON body, so anything but a string is
+    ignored rather than quoted into the filter or used as a cache key.
+    """
+    if not isinstance(name, str):
+        name = None
+    if api_key:
+        cached = providers_by_api_key.get(api_key)
+    else:
+        cached = providers_by_name.get(name) if name else None
+    if cached is not None:
+        return cached
+
+    key_hash = hash_key(api_key) if api_key else None
+    filters = []
+    if key_hash:
+        filters.append(f"api_key_hash.eq.{key_hash}")
+    if name:
+        filters.append(f"name.eq.{_quote_filter_value(name)}")
+    if not filters:
+        return None
+
+    try:
+        # At most one key match and one name match (names are unique)
+        result = await sb_exec(
+            sb.table("providers").select(PROVIDER_LOOKUP_COLUMNS).eq("is_active", True).or_(",".join(filters)).limit(2)
+        )
+    except Exception as e:
+        logger.warning(f"Provider lookup failed: {e}")
+        return None
+
+    rows = result.data or []
+    if key_hash:
+        provider = next((row for row in rows if row.get("api_key_hash") == key_hash), None)
+        if provider is not None:
+            providers_by_api_key.set(api_key, provider)
+            return provider
+    if rows:
+        providers_by_name.set(name, rows[0])
+        return rows[0]
+    return None
+
+
 async def _ensure_default_provider(sb) -> dict:
-    """Get or create a default provider for webhook ingestion."""
-    import hashlib
+    """
+    Get or create a default provider for webhook ingestion.
+
+    Uses the ensure_default_provider RPC (one round-trip); if that function
+    is not deployed or returns no row, falls back to a select followed by
+    an insert. Other RPC errors propagate.
+    """
     import secrets
+    global _default_provider_rpc_available
+
+    cached = default_provider.get(DEFAULT_PROVIDER_KEY)
+    if cached is not None:
+        return cached
+
+    if _default_provider_rpc_available:
+        try:
+            result = await sb_exec(sb.rpc("ensure_default_provider", {}))
+        except Exception as e:
+            if not is_missing_function(e):
+                logger.error(f"Default provider RPC failed: {e}")
+                raise
+            logger.warning(f"Default provider RPC not deployed, falling back: {e}")
+            _default_provider_rpc_available = False
+        else:
+            if result.data:
+                default_provider.set(DEFAULT_PROVIDER_KEY, result.data[0])
+                return result.data[0]
+            logger.warning("Default provider RPC returned no row, falling back")
 
     # Try to find any active provider
     try:
-        result = sb.table("providers").select("*").eq("is_active", True).order("created_at").limit(1).execute()
+        result = await sb_exec(sb.table("providers").select(PROVIDER_LOOKUP_COLUMNS).eq("is_active", True).order("created_at").limit(1))
         if result.data:
+            default_provider.set(DEFAULT_PROVIDER_KEY, result.data[0])
             return result.data[0]
     except Exception:
         pass
@@ -107,20 +325,21 @@ async def _ensure_default_provider(sb) -> dict:
     # Auto-create a default provider
     api_key = secrets.token_hex(32)
     webhook_secret = secrets.token_hex(32)
-    api_key_hash = hashlib.sha256(api_key.encode()).hexdigest()
-    webhook_secret_hash = hashlib.sha256(webhook_secret.encode()).hexdigest()
+    api_key_hash = hash_key(api_key)
+    webhook_secret_hash = hash_key(webhook_secret)
 
     try:
-        result = sb.table("providers").insert({
+        result = await sb_exec(sb.table("providers").insert({
             "name": "AutoBridge",
             "description": "Auto-created provider for Signal Bridge",
             "api_key_hash": api_key_hash,
             "webhook_secret": webhook_secret_hash,
             "is_active": True,
-        }).execute()
+        }))
 
         if result.data:
             logger.info(f"Auto-created default provider: {result.data[0]['id']}")
+            default_provider.set(DEFAULT_PROVIDER_KEY, result.data[0])
             return result.data[0]
     except Exception as e:
         logger.error(f"Failed to auto-create provider: {e}")
@@ -131,6 +350,7 @@ async def _ensure_default_provider(sb) -> dict:
 @router.post("/webhook/tradingview")
 async def ingest_tradingview(
     request: Request,
+    background_tasks: BackgroundTasks,
     x_api_key: Optional[str] = Header(None, alias="X-API-Key"),
     x_signature: Optional[str] = Header(None, alias="X-Signature"),
 ):
@@ -147,17 +367,21 @@ async def ingest_tradingview(
     3. Normalize to CanonicalSignal
     4. Validate (price sanity, RR, timing)
     5. Store in database
-    6. Create ENTRY_REGISTERED event
+    6. Create ENTRY_REGISTERED event (same transaction as 5, or after the
+       response if the RPC is unavailable)
     7. Return signal_id + validation result
     """
     # 1. Parse body
     raw_body = await request.body()
     try:
-        body = await request.json()
-    except Exception as e:
+        body = orjson.loads(raw_body)
+    except orjson.JSONDecodeError as e:
         logger.error(f"Failed to parse JSON body: {e}")
         raise HTTPException(400, "Invalid JSON body")
 
+    # Set when body is _parse_text_alert output rather than user JSON
+    from_text = False
+
     # Check if this is a TaskMagic-style payload with raw text in "body" field
     if isinstance(body.get("body"), str) and "symbol" not in body:
         logger.info("Detected TaskMagic text alert format, parsing...")
@@ -166,6 +390,7 @@ async def ingest_tradingview(
         if parsed.get("symbol") and parsed.get("direction"):
             body = parsed
             body["raw_text"] = text_body
+            from_text = True
         else:
             logger.error(f"Could not parse text alert: {text_body[:200]}")
             raise HTTPException(422, "Could not parse text alert. Expected symbol and direction.")
@@ -175,33 +400,15 @@ async def ingest_tradingview(
         parsed = _parse_text_alert(body)
         if parsed.get("symbol") and parsed.get("direction"):
             body = parsed
+            from_text = True
         else:
             raise HTTPException(422, "Could not parse text alert body")
 
     # 2. Resolve provider
     sb = get_supabase()
-    provider = None
-
-    # Option A: API key in header
-    if x_api_key:
-        try:
-            key_hash = hashlib.sha256(x_api_key.encode()).hexdigest()
-            result = sb.table("providers").select("*").eq("api_key_hash", key_hash).eq("is_active", True).execute()
-            if result.data:
-                provider = result.data[0]
-        except Exception as e:
-            logger.warning(f"Provider lookup by API key failed: {e}")
+    provider = await _find_provider(sb, api_key=x_api_key, name=body.get("provider"))
 
-    # Option B: Provider name in the webhook body
-    if not provider and body.get("provider"):
-        try:
-            result = sb.table("providers").select("*").eq("name", body["provider"]).eq("is_active", True).execute()
-            if result.data:
-                provider = result.data[0]
-        except Exception as e:
-            logger.warning(f"Provider lookup by name failed: {e}")
-
-    # Option C: Get or auto-create a default provider
+    # Otherwise get or auto-create a default provider
     if not provider:
         provider = await _ensure_default_provider(sb)
 
@@ -213,7 +420,12 @@ async def ingest_tradingview(
 
     # 3. Normalize
     try:
-        webhook = TradingViewWebhook(**body)
+        if from_text:
+            # Parsed text alerts already have LONG/SHORT direction and float
+            # prices, so skip validation
+            webhook = TradingViewWebhook.model_construct(**body)
+        else:
+            webhook = TradingViewWebhook(**body)
         signal = normalizer.normalize_tradingview(webhook, provider_id)
     except Exception as e:
         logger.error(f"Normalization failed: {e}")
@@ -221,34 +433,30 @@ async def ingest_tradingview(
 
     # 4. Validate
     validation = validator.validate(signal)
+    now_iso = datetime.now(timezone.utc).isoformat()
 
     if not validation.is_valid:
         logger.warning(f"Signal validation failed: {validation.errors}")
         # Store as INVALID for audit
         signal.status = SignalStatus.INVALID
-        _store_signal(sb, signal, validation)
+        await _store_signal(sb, signal, validation, now_iso)
+        invalidate_signal_lists()
         raise HTTPException(422, {
             "message": "Signal failed validation",
             "errors": validation.errors,
             "warnings": validation.warnings,
         })
 
-    # 5. Store signal
-    signal_data = _store_signal(sb, signal, validation)
-
-    # 6. Create ENTRY_REGISTERED event
-    try:
-        sb.table("signal_events").insert({
-            "signal_id": signal.id,
-            "event_type": "ENTRY_REGISTERED",
-            "price": signal.entry_price,
-            "source": "TRADINGVIEW",
-            "event_time": datetime.now(timezone.utc).isoformat(),
-            "metadata": {"raw_body": body},
-        }).execute()
-    except Exception as e:
-        logger.error(f"Failed to create ENTRY_REGISTERED event: {e}")
+    # 5-6. Store signal and its ENTRY_REGISTERED event
+    signal_data = await _store_signal_with_event(sb, signal, validation, now_iso, {
+        "event_type": "ENTRY_REGISTERED",
+        "price": signal.entry_price,
+        "source": "TRADINGVIEW",
+        "event_time": now_iso,
+        # No metadata: the payload is already stored in canonical_signals.raw_payload
+    }, background_tasks)
 
+    invalidate_signal_lists()
     logger.info(f"Signal ingested: {signal.id} | {signal.symbol} {signal.direction} @ {signal.entry_price}")
 
     return {
@@ -278,16 +486,21 @@ async def ingest_pinescript_event(request: Request):
         "price": 20150.50,
         "timestamp": "2025-02-13T10:30:00Z"
     }
+
+    A JSON array of such events (up to MAX_PINESCRIPT_BATCH) is processed
+    as one batch; see _ingest_pinescript_batch.
     """
-    try:
-        body = await request.json()
-    except Exception as e:
-        logger.error(f"Failed to parse PineScript event JSON: {e}")
-        raise HTTPException(400, "Invalid JSON body")
+    raw_body = await request.body()
+    if raw_body.lstrip()[:1] == b"[":
+        return await _ingest_pinescript_batch(raw_body)
 
+    # Parse and validate the raw bytes in one step (no intermediate dict)
     try:
-        event = PineScriptEvent(**body)
-    except Exception as e:
+        event = PineScriptEvent.model_validate_json(raw_body)
+    except ValidationError as e:
+        if any(err["type"] == "json_invalid" for err in e.errors()):
+            logger.error(f"Failed to parse PineScript event JSON: {e}")
+            raise HTTPException(400, "Invalid JSON body")
         logger.error(f"Invalid PineScript event schema: {e}")
         raise HTTPException(422, f"Invalid PineScript event: {str(e)}")
 
@@ -295,7 +508,7 @@ async def ingest_pinescript_event(request: Request):
 
     # Find the signal
     try:
-        result = sb.table("canonical_signals").select("*").eq("id", event.signal_id).execute()
+        result = await sb_exec(sb.table("canonical_signals").select("*").eq("id", event.signal_id))
         if not result.data:
             logger.warning(f"Signal not found: {event.signal_id}")
             raise HTTPException(404, f"Signal not found: {event.signal_id}")
@@ -313,27 +526,18 @@ async def ingest_pinescript_event(request: Request):
     new_status, did_transition = tr.new_status, tr.did_transition
 
     if did_transition:
+        now_iso = datetime.now(timezone.utc).isoformat()
         try:
             # Create event
-            sb.table("signal_events").insert({
-                "signal_id": event.signal_id,
-                "event_type": event.event_type,
-                "price": event.price,
-                "source": "PINESCRIPT",
-                "event_time": event.timestamp or datetime.now(timezone.utc).isoformat(),
-            }).execute()
+            await sb_exec(sb.table("signal_events").insert(
+                _pinescript_event_row(event, now_iso), returning="minimal"
+            ))
 
             # Update signal status
-            update_data = {"status": new_status.value}
-            if new_status in (SignalStatus.SL_HIT, SignalStatus.CLOSED, SignalStatus.TP3_HIT):
-                update_data["closed_at"] = datetime.now(timezone.utc).isoformat()
-                update_data["close_reason"] = new_status.value
-                update_data["exit_price"] = event.price
-            if event_type == EventType.ENTRY_HIT:
-                update_data["activated_at"] = datetime.now(timezone.utc).isoformat()
-
-            sb.table("canonical_signals").update(update_data).eq("id", event.signal_id).execute()
+            update_data = _transition_update(event, event_type, new_status, now_iso)
+            await sb_exec(sb.table("canonical_signals").update(update_data).eq("id", event.signal_id))
 
+            invalidate_signal(event.signal_id)
             logger.info(f"PineScript event: {event.event_type} for signal {event.signal_id} @ {event.price}")
         except Exception as e:
             logger.error(f"Failed to process state transition: {e}")
@@ -348,33 +552,226 @@ async def ingest_pinescript_event(request: Request):
     }
 
 
-def _store_signal(sb, signal, validation):
-    """Store a canonical signal in the database."""
+async def _ingest_pinescript_batch(raw_body: bytes) -> dict:
+    """
+    Process an array of PineScript events with a bounded number of round-trips.
+
+    Parallel selects of up to SIGNAL_ID_LOOKUP_CHUNK ids each load every
+    referenced signal, the state machine runs in order over the batch (so
+    several events for one signal chain), then all new events and status
+    changes are written by one apply_signal_updates RPC. Events with an
+    unknown event_type (or signals in an unknown status) are reported per
+    event and skipped.
+    """
     try:
-        data = {
-            "id": signal.id,
-            "provider_id": signal.provider_id,
-            "external_signal_id": signal.external_signal_id,
-            "strategy_name": signal.strategy_name,
-            "symbol": signal.symbol,
-            "asset_class": signal.asset_class.value if hasattr(signal.asset_class, 'value') else signal.asset_class,
-            "direction": signal.direction.value if hasattr(signal.direction, 'value') else signal.direction,
-            "entry_price": signal.entry_price,
-            "sl": signal.sl,
-            "tp1": signal.tp1,
-            "tp2": signal.tp2,
-            "tp3": signal.tp3,
-            "risk_distance": signal.risk_distance,
-            "rr_ratio": signal.rr_ratio,
-            "status": signal.status.value if hasattr(signal.status, 'value') else signal.status,
-            "entry_time": signal.entry_time.isoformat() if hasattr(signal.entry_time, 'isoformat') else signal.entry_time,
-            "raw_payload": signal.raw_payload,
-            "validation_errors": validation.errors if validation.errors else None,
-            "validation_warnings": validation.warnings if validation.warnings else None,
-            "next_poll_at": datetime.now(timezone.utc).isoformat(),
+        events = _pinescript_batch_adapter.validate_json(raw_body)
+    except ValidationError as e:
+        if any(err["type"] == "json_invalid" for err in e.errors()):
+            logger.error(f"Failed to parse PineScript batch JSON: {e}")
+            raise HTTPException(400, "Invalid JSON body")
+        logger.error(f"Invalid PineScript batch schema: {e}")
+        raise HTTPException(422, f"Invalid PineScript event: {str(e)}")
+
+    if len(events) > MAX_PINESCRIPT_BATCH:
+        raise HTTPException(422, f"Too many events in batch (max {MAX_PINESCRIPT_BATCH})")
+
+    sb = get_supabase()
+    signal_ids = list(dict.fromkeys(event.signal_id for event in events))
+
+    try:
+        lookups = await asyncio.gather(*(
+            sb_exec(sb.table("canonical_signals").select("id,status").in_("id", signal_ids[i:i + SIGNAL_ID_LOOKUP_CHUNK]))
+            for i in range(0, len(signal_ids), SIGNAL_ID_LOOKUP_CHUNK)
+        ))
+        # Raw status strings; converted per event so one bad row only
+        # fails the events that reference it
+        statuses = {
+            row["id"]: row["status"]
+            for result in lookups
+            for row in (result.data or [])
         }
-        result = sb.table("canonical_signals").insert(data).execute()
+    except Exception as e:
+        logger.error(f"Database query failed: {e}")
+        raise HTTPException(500, "Failed to retrieve signals")
+
+    now_iso = datetime.now(timezone.utc).isoformat()
+    event_rows = []
+    updates = {}
+    results = []
+    for event in events:
+        current_status = statuses.get(event.signal_id)
+        if current_status is None:
+            logger.warning(f"Signal not found: {event.signal_id}")
+            results.append({"signal_id": event.signal_id, "event_type": event.event_type, "status": "not_found"})
+            continue
+
+        try:
+            event_type = EventType(event.event_type)
+        except ValueError:
+            logger.warning(f"Unknown PineScript event type: {event.event_type}")
+            results.append({"signal_id": event.signal_id, "event_type": event.event_type, "status": "invalid_event_type"})
+            continue
+        try:
+            current_status = SignalStatus(current_status)
+        except ValueError:
+            logger.error(f"Signal {event.signal_id} has unknown status: {current_status}")
+            results.append({"signal_id": event.signal_id, "event_type": event.event_type, "status": "invalid_status"})
+            continue
+
+        tr = SignalStateMachine.process_event(current_status, event_type)
+        if tr.did_transition:
+            statuses[event.signal_id] = tr.new_status
+            event_rows.append(_pinescript_event_row(event, now_iso))
+            # Later transitions for the same signal overwrite earlier fields,
+            # as sequential updates would
+            updates.setdefault(event.signal_id, {}).update(
+                _transition_update(event, event_type, tr.new_status, now_iso)
+            )
+        results.append({
+            "signal_id": event.signal_id,
+            "event_type": event.event_type,
+            "status": "processed",
+            "did_transition": tr.did_transition,
+            "new_status": tr.new_status.value,
+        })
+
+    if event_rows:
+        try:
+            await _apply_signal_transitions(sb, event_rows, updates)
+            for signal_id in updates:
+                invalidate_signal(signal_id)
+            logger.info(f"PineScript batch: {len(event_rows)} transitions across {len(updates)} signals")
+        except Exception as e:
+            logger.error(f"Failed to process state transitions: {e}")
+            raise HTTPException(500, "Failed to process events")
+
+    return {
+        "status": "processed",
+        "transitions": len(event_rows),
+        "results": results,
+    }
+
+
+async def _apply_signal_transitions(sb, event_rows: list, updates: dict):
+    """
+    Insert event_rows and apply {signal_id: update_data} in one transaction.
+
+    Uses the apply_signal_updates RPC. If that function is not deployed,
+    inserts the events and then runs one update per signal; that fallback
+    is not atomic, so a failure part-way can leave events recorded without
+    their status change. Other RPC errors propagate.
+    """
+    global _signal_updates_rpc_available
+    if _signal_updates_rpc_available:
+        try:
+            await sb_exec(sb.rpc("apply_signal_updates", {
+                "events": event_rows,
+                "updates": [{"id": signal_id, **data} for signal_id, data in updates.items()],
+            }))
+            return
+        except Exception as e:
+            if not is_missing_function(e):
+                raise
+            logger.warning(f"Signal update RPC not deployed, updating separately: {e}")
+            _signal_updates_rpc_available = False
+
+    await sb_exec(sb.table("signal_events").insert(event_rows, returning="minimal"))
+    await asyncio.gather(*(
+        sb_exec(sb.table("canonical_signals").update(data).eq("id", signal_id))
+        for signal_id, data in updates.items()
+    ))
+
+
+def _pinescript_event_row(event: PineScriptEvent, now_iso: str) -> dict:
+    """Build the signal_events row for a PineScript event."""
+    return {
+        "signal_id": event.signal_id,
+        "event_type": event.event_type,
+        "price": event.price,
+        "source": "PINESCRIPT",
+        "event_time": event.timestamp or now_iso,
+    }
+
+
+def _transition_update(event: PineScriptEvent, event_type: EventType, new_status: SignalStatus, now_iso: str) -> dict:
+    """canonical_signals columns to set after a PineScript event transitions a signal."""
+    update_data = {"status": new_status.value}
+    if new_status in (SignalStatus.SL_HIT, SignalStatus.CLOSED, SignalStatus.TP3_HIT):
+        update_data["closed_at"] = now_iso
+        update_data["close_reason"] = new_status.value
+        update_data["exit_price"] = event.price
+    if event_type == EventType.ENTRY_HIT:
+        update_data["activated_at"] = now_iso
+    return update_data
+
+
+def _signal_row(signal, validation, now_iso: str) -> dict:
+    """Build the canonical_signals row for a signal."""
+    return {
+        "id": signal.id,
+        "provider_id": signal.provider_id,
+        "external_signal_id": signal.external_signal_id,
+        "strategy_name": signal.strategy_name,
+        "symbol": signal.symbol,
+        "asset_class": signal.asset_class.value if hasattr(signal.asset_class, 'value') else signal.asset_class,
+        "direction": signal.direction.value if hasattr(signal.direction, 'value') else signal.direction,
+        "entry_price": signal.entry_price,
+        "sl": signal.sl,
+        "tp1": signal.tp1,
+        "tp2": signal.tp2,
+        "tp3": signal.tp3,
+        "risk_distance": signal.risk_distance,
+        "rr_ratio": signal.rr_ratio,
+        "status": signal.status.value if hasattr(signal.status, 'value') else signal.status,
+        "entry_time": signal.entry_time.isoformat() if hasattr(signal.entry_time, 'isoformat') else signal.entry_time,
+        "raw_payload": signal.raw_payload,
+        "validation_errors": validation.errors if validation.errors else None,
+        "validation_warnings": validation.warnings if validation.warnings else None,
+        "next_poll_at": now_iso,
+    }
+
+
+async def _store_signal(sb, signal, validation, now_iso: str):
+    """Store a canonical signal in the database."""
+    try:
+        data = _signal_row(signal, validation, now_iso)
+        result = await sb_exec(sb.table("canonical_signals").insert(data))
         return result.data[0] if result.data else data
     except Exception as e:
         logger.error(f"Failed to store signal in database: {e}")
         raise
+
+
+async def _record_event(sb, signal_id: str, event: dict):
+    """Insert a signal event, logging (not raising) on failure."""
+    try:
+        await sb_exec(sb.table("signal_events").insert({"signal_id": signal_id, **event}, returning="minimal"))
+    except Exception as e:
+        logger.error(f"Failed to create {event['event_type']} event: {e}")
+
+
+async def _store_signal_with_event(sb, signal, validation, now_iso: str, event: dict, background_tasks: BackgroundTasks):
+    """
+    Store a canonical signal and its first event in one transaction.
+
+    Uses the insert_signal_with_entry_event RPC; if that function is not
+    deployed, inserts the signal and defers the event insert until after
+    the response. Other RPC errors propagate, since the insert may already
+    have committed and retrying it separately could store a duplicate.
+    """
+    global _ingest_rpc_available
+    if _ingest_rpc_available:
+        data = _signal_row(signal, validation, now_iso)
+        try:
+            result = await sb_exec(sb.rpc("insert_signal_with_entry_event", {"signal": data, "event": event}))
+            return result.data[0] if result.data else data
+        except Exception as e:
+            if not is_missing_function(e):
+                logger.error(f"Signal ingest RPC failed: {e}")
+                raise
+            logger.warning(f"Signal ingest RPC not deployed, inserting separately: {e}")
+            _ingest_rpc_available = False
+
+    signal_data = await _store_signal(sb, signal, validation, now_iso)
+    background_tasks.add_task(_record_event, sb, signal.id, event)
+    return signal_data
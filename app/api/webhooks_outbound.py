@@ -5,13 +5,15 @@ Manages destination webhooks that receive notifications from the Signal Bridge.
 
 import logging
 import httpx
+import orjson
 from datetime import datetime, timezone
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field, HttpUrl
 
 from app.database import get_supabase
-from app.notifications.webhook_sender import WebhookSender
+from app.notifications.webhook_sender import WebhookSender, get_http_client
 from app.models.canonical_signal import EventType
 
 logger = logging.getLogger(__name__)
@@ -74,7 +76,7 @@ class TestWebhookResponse(BaseModel):
 # Valid Event Types
 # ============================================================================
 
-VALID_EVENT_TYPES = [
+VALID_EVENT_TYPES = frozenset({
     "ENTRY_REGISTERED",
     "ENTRY_HIT",
     "TP1_HIT",
@@ -85,7 +87,28 @@ VALID_EVENT_TYPES = [
     "INVALID",
     "MANUAL_CLOSE",
     "TEST_EVENT",
-]
+})
+
+
+# ============================================================================
+# Helper Functions
+# ============================================================================
+
+def webhook_to_dict(webhook: dict) -> dict:
+    """Shape a webhook_configs row as a WebhookResponse payload."""
+    return {
+        "id": webhook["id"],
+        "provider_id": webhook["provider_id"],
+        "name": webhook["name"],
+        "url": webhook["url"],
+        "event_types": webhook["event_types"],
+        "headers": webhook.get("headers"),
+        "is_active": webhook["is_active"],
+        "created_at": webhook["created_at"],
+        "updated_at": webhook.get("updated_at"),
+        "last_delivery_at": webhook.get("last_delivery_at"),
+        "consecutive_failures": webhook.get("consecutive_failures", 0),
+    }
 
 
 # ============================================================================
@@ -128,9 +151,9 @@ async def create_webhook(req: CreateWebhookRequest):
             raise HTTPException(404, f"Provider not found: {req.provider_id}")
 
         # Validate event types
-        for et in req.event_types:
-            if et not in VALID_EVENT_TYPES:
-                raise HTTPException(400, f"Invalid event type: {et}")
+        invalid = set(req.event_types) - VALID_EVENT_TYPES
+        if invalid:
+            raise HTTPException(400, f"Invalid event types: {', '.join(sorted(invalid))}")
 
         now = datetime.now(timezone.utc).isoformat()
 
@@ -192,49 +215,25 @@ async def list_webhooks(
     sb = get_supabase()
 
     try:
-        query = sb.table("webhook_configs").select("*")
+        query = sb.table("webhook_configs").select("*", count="exact")
 
         if provider_id:
             query = query.eq("provider_id", provider_id)
         if is_active is not None:
             query = query.eq("is_active", is_active)
 
-        # Get total count
-        count_result = query.execute()
-        total = len(count_result.data) if count_result.data else 0
-
-        # Apply pagination
-        query = sb.table("webhook_configs").select("*")
-        if provider_id:
-            query = query.eq("provider_id", provider_id)
-        if is_active is not None:
-            query = query.eq("is_active", is_active)
-
+        # Page and total count in one request
         result = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
-
-        items = [
-            WebhookResponse(
-                id=webhook["id"],
-                provider_id=webhook["provider_id"],
-                name=webhook["name"],
-                url=webhook["url"],
-                event_types=webhook["event_types"],
-                headers=webhook.get("headers"),
-                is_active=webhook["is_active"],
-                created_at=webhook["created_at"],
-                updated_at=webhook.get("updated_at"),
-                last_delivery_at=webhook.get("last_delivery_at"),
-                consecutive_failures=webhook.get("consecutive_failures", 0),
-            )
-            for webhook in (result.data or [])
-        ]
-
-        return WebhookListResult(
-            total=total,
-            limit=limit,
-            offset=offset,
-            items=items,
-        )
+        total = result.count or 0
+
+        # Serialize plain dicts directly instead of building a model per row
+        # and having response_model validate them all again
+        return ORJSONResponse({
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "items": [webhook_to_dict(webhook) for webhook in (result.data or [])],
+        })
     except Exception as e:
         logger.error(f"Failed to list outbound webhooks: {e}")
         raise HTTPException(500, "Failed to list webhooks")
@@ -304,12 +303,13 @@ async def test_webhook(webhook_id: str, req: Optional[TestWebhookRequest] = None
         req = req or TestWebhookRequest()
 
         # Build test payload
+        now = datetime.now(timezone.utc)
         test_payload = {
-            "event_id": f"test_{datetime.now(timezone.utc).timestamp()}",
+            "event_id": f"test_{now.timestamp()}",
             "signal_id": req.signal_id or "test_signal",
             "event_type": req.event_type,
             "price": req.price,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now.isoformat(),
             "signal": {
                 "symbol": "TEST",
                 "direction": "LONG",
@@ -327,23 +327,22 @@ async def test_webhook(webhook_id: str, req: Optional[TestWebhookRequest] = None
         start = time.time()
 
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.post(
-                    webhook["url"],
-                    json=test_payload,
-                    headers={
-                        "X-Idempotency-Key": test_payload["event_id"],
-                        "Content-Type": "application/json",
-                    },
-                )
-                latency_ms = (time.time() - start) * 1000
-
-                return TestWebhookResponse(
-                    status="success" if response.status_code < 300 else "failed",
-                    code=response.status_code,
-                    latency_ms=round(latency_ms, 2),
-                    message=response.text[:500] if response.status_code >= 400 else None,
-                )
+            response = await get_http_client().post(
+                webhook["url"],
+                content=orjson.dumps(test_payload),
+                headers={
+                    "X-Idempotency-Key": test_payload["event_id"],
+                    "Content-Type": "application/json",
+                },
+            )
+            latency_ms = (time.time() - start) * 1000
+
+            return TestWebhookResponse(
+                status="success" if response.status_code < 300 else "failed",
+                code=response.status_code,
+                latency_ms=round(latency_ms, 2),
+                message=response.text[:500] if response.status_code >= 400 else None,
+            )
         except httpx.RequestError as e:
             latency_ms = (time.time() - start) * 1000
             logger.error(f"Webhook test failed: {e}")
@@ -0,0 +1,38 @@
+"""
+In-process TTL cache.
+Short-lived memoization for hot read paths (per process / per warm serverless instance).
+"""
+
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """In-memory key/value cache with per-entry TTL and a size bound."""
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 1024):
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self.ttl = ttl_seconds
+        self.maxsize = maxsize
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if key not in self._data and len(self._data) >= self.maxsize:
+            # Evict the oldest entry (dicts keep insertion order)
+            self._data.pop(next(iter(self._data)), None)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
@@ -12,6 +12,7 @@ class Settings(BaseSettings):
     supabase_url: str = "https://your-project.supabase.co"
     supabase_key: str = ""
     supabase_service_key: str = ""
+    supabase_max_concurrency: int = 10   # in-flight queries per process
 
     # --- API Security ---
     webhook_secret: str = "change-me-in-production"
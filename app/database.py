@@ -1,25 +1,98 @@
 """
 Supabase client singleton.
 Uses service_role key for server-side operations (bypasses RLS).
+
+The supabase package is imported on first use rather than at module load,
+so serverless cold starts that never touch the database don't pay for it.
 """
 
-from supabase import create_client, Client
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any
+
 from app.config import settings
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 _client: Client | None = None
+_anon_client: Client | None = None
+_client_lock = threading.Lock()
+
+# Bounds in-flight Supabase queries so bursts queue here instead of
+# exhausting the project's connection limit. One semaphore per event loop,
+# created on first use: asyncio primitives bind to the loop that first
+# waits on them, so a shared module-level one breaks under a second loop.
+_query_semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
 
 
 def get_supabase() -> Client:
-    """Get or create the Supabase client (service-role for backend)."""
+    """
+    Get or create the Supabase client (service-role for backend).
+
+    After the first call this is a lock-free global read. The lock only
+    guards creation; functools.cache would not, since concurrent first
+    calls can each run the wrapped function.
+    """
     global _client
     if _client is None:
-        _client = create_client(
-            settings.supabase_url,
-            settings.supabase_service_key or settings.supabase_key,
-        )
+        # Double-checked so threads racing on first use share one client
+        with _client_lock:
+            if _client is None:
+                from supabase import create_client
+                _client = create_client(
+                    settings.supabase_url,
+                    settings.supabase_service_key or settings.supabase_key,
+                )
     return _client
 
 
 def get_supabase_anon() -> Client:
-    """Get a Supabase client with the anon key (respects RLS)."""
-    return create_client(settings.supabase_url, settings.supabase_key)
+    """Get or create a Supabase client with the anon key (respects RLS)."""
+    global _anon_client
+    if _anon_client is None:
+        with _client_lock:
+            if _anon_client is None:
+                from supabase import create_client
+                _anon_client = create_client(settings.supabase_url, settings.supabase_key)
+    return _anon_client
+
+
+def _query_semaphore() -> asyncio.Semaphore:
+    """The query semaphore for the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _query_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _query_semaphores[loop] = asyncio.Semaphore(settings.supabase_max_concurrency)
+    return semaphore
+
+
+async def run_query(func, *args) -> Any:
+    """
+    Run a blocking Supabase call in a worker thread.
+
+    At most settings.supabase_max_concurrency calls are in flight at once;
+    the rest wait here.
+    """
+    async with _query_semaphore():
+        return await asyncio.to_thread(func, *args)
+
+
+async def sb_exec(query) -> Any:
+    """Execute a supabase-py query builder without blocking the event loop."""
+    return await run_query(query.execute)
+
+
+def is_missing_function(exc: Exception) -> bool:
+    """
+    True if `exc` is PostgREST reporting that an RPC function does not exist.
+
+    PostgREST answers an unknown function with code PGRST202 (HTTP 404).
+    Other errors (timeouts, constraint violations, ...) return False so
+    callers re-raise them instead of silently falling back.
+    """
+    code = getattr(exc, "code", None)
+    return code == "PGRST202" or str(code) == "404"
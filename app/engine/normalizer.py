@@ -15,7 +15,8 @@ Key responsibilities:
 """
 
 import re
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Tuple, Optional, Dict, Any
 from pydantic import BaseModel, Field
 
@@ -27,6 +28,7 @@ from app.models.canonical_signal import (
     EventType,
     EventSource,
     SignalEvent,
+    compute_risk_metrics,
 )
 
 
@@ -34,6 +36,49 @@ from app.models.canonical_signal import (
 from app.models.webhook_schemas import TradingViewWebhook, PineScriptEvent
 
 
+# Continuous-contract suffixes stripped from symbols ("NQ1!" → "NQ")
+_CONTINUOUS_SUFFIXES = tuple(f"{digit}!" for digit in "0123456789")
+
+# PineScript event_type strings → EventType
+_EVENT_TYPE_MAP = {
+    "entry": EventType.ENTRY_HIT,
+    "tp1": EventType.TP1_HIT,
+    "tp2": EventType.TP2_HIT,
+    "tp3": EventType.TP3_HIT,
+    "sl": EventType.SL_HIT,
+    "close": EventType.MANUAL_CLOSE,
+}
+
+# strptime formats tried by _parse_timestamp when the fast path doesn't match
+_ISO_FORMATS = (
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%d %H:%M:%S",
+)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_symbol_cached(raw_symbol: str) -> Tuple[str, AssetClass]:
+    """
+    Memoized SignalNormalizer._normalize_symbol_impl.
+
+    Providers send the same few symbols over and over, and the result is a
+    pure function of the input. Errors are not cached.
+    """
+    return SignalNormalizer._normalize_symbol_impl(raw_symbol)
+
+
+@lru_cache(maxsize=1024)
+def _parse_timestamp_cached(timestamp_str: str) -> Optional[datetime]:
+    """
+    Memoized SignalNormalizer._parse_timestamp_impl.
+
+    Webhooks in a batch often share a timestamp (same bar close). Only the
+    parse result is cached; the utcnow() fallback is not.
+    """
+    return SignalNormalizer._parse_timestamp_impl(timestamp_str)
+
+
 class SignalNormalizer:
     """
     Normalizes signals from various sources into the canonical format.
@@ -42,8 +87,10 @@ class SignalNormalizer:
     This class is stateless and contains only static methods for pure transformations.
     """
 
-    # Futures contract symbols (after normalization)
-    FUTURES_SYMBOLS = {
+    # Futures contract symbols (after normalization). Matched as part of
+    # ASSET_CLASS_PATTERN; repeat symbols never reach it (normalize_symbol
+    # is memoized), so no packed-int or perfect-hash variant is kept.
+    FUTURES_SYMBOLS = frozenset({
         "NQ", "MNQ",    # Nasdaq 100 (micro)
         "ES", "MES",    # S&P 500 (micro)
         "YM", "MYM",    # Dow Jones (micro)
@@ -53,16 +100,27 @@ class SignalNormalizer:
         "SI", "SIL",    # Silver (micro)
         "ZB", "ZN",     # Bonds
         "ZW", "ZC",     # Agricultural
-    }
+    })
 
     # Forex pairs are exactly 6 uppercase letters
     FOREX_PATTERN = re.compile(r"^[A-Z]{6}$")
 
-    # Crypto asset suffixes
-    CRYPTO_SUFFIXES = ("USDT", "USD", "BTC", "ETH", "BUSD")
-
-    # Symbol cleanup patterns
-    SUFFIX_PATTERN = re.compile(r"[0-9]!$")  # e.g., "NQ1!" → "NQ"
+    # Crypto asset suffixes, most specific first (USDT before USD)
+    CRYPTO_SUFFIXES = ("USDT", "BUSD", "USD", "BTC", "ETH")
+
+    # Whole asset-class decision as one anchored alternation; the named group
+    # that matched is the class. Alternatives are tried in the same order as
+    # the checks they replace: futures, then forex, then crypto suffix.
+    ASSET_CLASS_PATTERN = re.compile(
+        r"(?s)(?:(?P<futures>" + "|".join(sorted(FUTURES_SYMBOLS, key=len, reverse=True)) + r")"
+        r"|(?P<forex>[A-Z]{6})"
+        r"|(?P<crypto>.*(?:" + "|".join(CRYPTO_SUFFIXES) + r")))\Z"
+    )
+    ASSET_CLASS_BY_GROUP = {
+        "futures": AssetClass.FUTURES,
+        "forex": AssetClass.FOREX,
+        "crypto": AssetClass.CRYPTO,
+    }
 
     @staticmethod
     def normalize_symbol(raw_symbol: str) -> Tuple[str, AssetClass]:
@@ -87,11 +145,17 @@ class SignalNormalizer:
         if not raw_symbol or not isinstance(raw_symbol, str):
             raise ValueError(f"Invalid symbol: {raw_symbol}")
 
+        return _normalize_symbol_cached(raw_symbol)
+
+    @staticmethod
+    def _normalize_symbol_impl(raw_symbol: str) -> Tuple[str, AssetClass]:
+        """Uncached body of normalize_symbol (raw_symbol is a non-empty str)."""
         # Clean whitespace
         symbol = raw_symbol.strip().upper()
 
         # Remove futures suffix (e.g., "NQ1!" → "NQ")
-        symbol = SignalNormalizer.SUFFIX_PATTERN.sub("", symbol)
+        if symbol.endswith(_CONTINUOUS_SUFFIXES):
+            symbol = symbol[:-2]
 
         if not symbol:
             raise ValueError(f"Symbol resulted in empty string after normalization: {raw_symbol}")
@@ -112,24 +176,17 @@ class SignalNormalizer:
         Returns:
             AssetClass enum value
         """
-        # Check futures first
-        if normalized_symbol in SignalNormalizer.FUTURES_SYMBOLS:
-            return AssetClass.FUTURES
-
-        # Check forex BEFORE crypto (EURUSD ends in "USD" but is forex, not crypto)
-        # Forex pairs are exactly 6 uppercase letters (e.g., EURUSD, GBPJPY)
-        if SignalNormalizer.FOREX_PATTERN.match(normalized_symbol):
-            return AssetClass.FOREX
-
-        # Check crypto by suffix (must come after forex check)
-        if any(normalized_symbol.endswith(suffix) for suffix in SignalNormalizer.CRYPTO_SUFFIXES):
-            return AssetClass.CRYPTO
+        # Futures first, then forex BEFORE crypto (EURUSD ends in "USD" but is
+        # forex, not crypto), then crypto by suffix - all in one match
+        m = _ASSET_CLASS_MATCH(normalized_symbol)
+        if m:
+            return _ASSET_CLASS_BY_GROUP[m.lastgroup]
 
         # Default to stocks for 1-5 char symbols or other patterns
         return AssetClass.STOCKS
 
     @staticmethod
-    def _parse_timestamp(timestamp_input: Optional[str]) -> datetime:
+    def _parse_timestamp(timestamp_input: Optional[str], now: Optional[datetime] = None) -> datetime:
         """
         Parse various timestamp formats.
 
@@ -141,6 +198,7 @@ class SignalNormalizer:
 
         Args:
             timestamp_input: Timestamp string or None
+            now: Fallback time to use instead of datetime.utcnow()
 
         Returns:
             datetime object in UTC
@@ -149,18 +207,47 @@ class SignalNormalizer:
             ValueError: If timestamp format is unrecognizable
         """
         if not timestamp_input:
-            return datetime.utcnow()
+            return now if now is not None else datetime.utcnow()
 
-        timestamp_str = str(timestamp_input).strip()
+        parsed = _parse_timestamp_cached(str(timestamp_input).strip())
+        if parsed is not None:
+            return parsed
 
-        # Try ISO 8601 formats
-        iso_formats = [
-            "%Y-%m-%dT%H:%M:%SZ",
-            "%Y-%m-%dT%H:%M:%S%z",
-            "%Y-%m-%d %H:%M:%S",
-        ]
+        # Fallback: use current time and warn
+        return now if now is not None else datetime.utcnow()
 
-        for fmt in iso_formats:
+    @staticmethod
+    def _parse_timestamp_impl(timestamp_str: str) -> Optional[datetime]:
+        """Uncached body of _parse_timestamp; None if the format is unrecognized."""
+        # Fast path for the common shapes, without strptime's per-format
+        # exceptions. Anything it doesn't handle goes through the formats below.
+        m = _ISO_TIMESTAMP_MATCH(timestamp_str)
+        if m:
+            year, month, day, sep, hour, minute, second, suffix, sign, off_h, off_m = m.groups()
+            # "T" needs a Z/offset suffix and " " must not have one (as below)
+            if (sep == "T") == (suffix is not None):
+                try:
+                    tzinfo = None
+                    if sign:
+                        offset = timedelta(hours=int(off_h), minutes=int(off_m))
+                        tzinfo = timezone(-offset if sign == "-" else offset)
+                    return datetime(
+                        int(year), int(month), int(day),
+                        int(hour), int(minute), int(second),
+                        tzinfo=tzinfo,
+                    )
+                except ValueError:
+                    pass
+
+        # Unix epoch as whole seconds. Epochs come back naive UTC, like the
+        # "Z" formats; only an explicit offset yields an aware datetime.
+        if timestamp_str.isascii() and timestamp_str.isdigit() and len(timestamp_str) <= 10:
+            epoch_seconds = int(timestamp_str)
+            if epoch_seconds > 0:
+                return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).replace(tzinfo=None)
+
+        # Try ISO 8601 formats
+        for fmt in _ISO_FORMATS:
             try:
                 dt = datetime.strptime(timestamp_str, fmt)
                 # Ensure timezone-naive datetime is treated as UTC
@@ -172,17 +259,33 @@ class SignalNormalizer:
         try:
             epoch_seconds = float(timestamp_str)
             if 0 < epoch_seconds < 10**10:  # Sanity check for seconds
-                return datetime.utcfromtimestamp(epoch_seconds)
+                return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).replace(tzinfo=None)
         except (ValueError, OSError):
             pass
 
-        # Fallback: use current time and warn
-        return datetime.utcnow()
+        return None
+
+    @staticmethod
+    def _resolve_entry(webhook: TradingViewWebhook, extra: Dict[str, Any]) -> float:
+        """
+        Entry price from the entry field, else the extra entry_price/entry keys.
+
+        Args:
+            webhook: TradingViewWebhook model instance
+            extra: webhook.model_extra (or {} if None)
+
+        Returns:
+            Entry price (0.0 when no entry is present)
+        """
+        if webhook.entry is not None:
+            return float(webhook.entry)
+        return float(extra.get('entry_price') or extra.get('entry', 0))
 
     @staticmethod
     def normalize_tradingview(
         webhook: TradingViewWebhook,
         provider_id: str,
+        now: Optional[datetime] = None,
     ) -> CanonicalSignal:
         """
         Convert a TradingView webhook payload into a CanonicalSignal.
@@ -190,6 +293,8 @@ class SignalNormalizer:
         Args:
             webhook: TradingViewWebhook model instance
             provider_id: ID of the provider sending this signal
+            now: Entry time to use when the webhook has no usable timestamp
+                 (defaults to the current UTC time)
 
         Returns:
             CanonicalSignal instance
@@ -210,28 +315,53 @@ class SignalNormalizer:
         direction = SignalDirection.LONG if webhook.direction.upper() == "LONG" else SignalDirection.SHORT
 
         # Parse timestamp
-        entry_time = SignalNormalizer._parse_timestamp(webhook.timestamp)
+        entry_time = SignalNormalizer._parse_timestamp(webhook.timestamp, now)
+
+        # Extra (non-field) keys, fetched once for every fallback lookup below
+        extra = webhook.model_extra or {}
+
+        entry_price = SignalNormalizer._resolve_entry(webhook, extra)
+        sl = float(webhook.sl) if webhook.sl is not None else None
+        tp1 = float(webhook.tp1) if webhook.tp1 is not None else None
+
+        # Risk metrics are computed up front and passed to the constructor,
+        # rather than assigned field by field on the built model
+        risk_distance, rr_ratio = compute_risk_metrics(entry_price, sl, tp1)
 
         # Create the canonical signal
-        signal = CanonicalSignal(
+        fields = dict(
             provider_id=provider_id,
-            external_signal_id=getattr(webhook, 'external_id', None),
-            strategy_name=getattr(webhook, 'strategy', None) or getattr(webhook, 'strategy_name', None),
+            external_signal_id=extra.get('external_id'),
+            strategy_name=webhook.strategy or extra.get('strategy_name'),
             symbol=normalized_symbol,
             asset_class=asset_class,
             direction=direction,
-            entry_price=float(webhook.entry if webhook.entry is not None else (getattr(webhook, 'entry_price', None) or webhook.model_extra.get('entry_price', 0) or webhook.model_extra.get('entry', 0))),
-            sl=float(webhook.sl) if webhook.sl is not None else None,
-            tp1=float(webhook.tp1) if webhook.tp1 is not None else None,
+            entry_price=entry_price,
+            sl=sl,
+            tp1=tp1,
             tp2=float(webhook.tp2) if webhook.tp2 is not None else None,
             tp3=float(webhook.tp3) if webhook.tp3 is not None else None,
             status=SignalStatus.PENDING,
             entry_time=entry_time,
-            raw_payload=webhook.model_dump(),
+            risk_distance=risk_distance,
+            rr_ratio=rr_ratio,
+            # Kept as a dict: raw_payload is a JSONB column written through
+            # supabase-py, and dumping to JSON here would only be parsed back.
+            # TradingViewWebhook's fields are all flat (str/float/None), so
+            # dict() gives the same fields + extras as model_dump() without
+            # a serializer pass.
+            raw_payload=dict(webhook),
         )
 
-        # Calculate risk metrics
-        signal.calculate_risk_metrics()
+        # Every field above is already the right type, except the two taken
+        # from unvalidated extras; only validate when one of those isn't a str
+        if all(
+            value is None or isinstance(value, str)
+            for value in (fields["external_signal_id"], fields["strategy_name"])
+        ):
+            signal = CanonicalSignal.model_construct(**fields)
+        else:
+            signal = CanonicalSignal(**fields)
 
         return signal
 
@@ -260,17 +390,8 @@ class SignalNormalizer:
             raise ValueError("PineScript event missing 'event_type' field")
 
         # Map event_type string to EventType enum
-        event_type_map = {
-            "entry": EventType.ENTRY_HIT,
-            "tp1": EventType.TP1_HIT,
-            "tp2": EventType.TP2_HIT,
-            "tp3": EventType.TP3_HIT,
-            "sl": EventType.SL_HIT,
-            "close": EventType.MANUAL_CLOSE,
-        }
-
         event_type_str = event.event_type.lower().strip()
-        event_type = event_type_map.get(event_type_str, EventType.PRICE_UPDATE)
+        event_type = _EVENT_TYPE_MAP.get(event_type_str, EventType.PRICE_UPDATE)
 
         # Parse timestamp
         event_time = SignalNormalizer._parse_timestamp(event.timestamp)
@@ -313,9 +434,17 @@ class SignalNormalizer:
         """
         signals = []
 
-        for webhook in webhooks:
+        # Drop webhooks missing required fields up front instead of letting
+        # normalize_tradingview raise for each one; the try below only
+        # guards malformed values (unparseable symbols, non-numeric prices)
+        candidates = [webhook for webhook in webhooks if webhook.symbol and webhook.direction]
+
+        # One fallback entry time for the whole batch
+        batch_now = datetime.utcnow()
+
+        for webhook in candidates:
             try:
-                signal = SignalNormalizer.normalize_tradingview(webhook, provider_id)
+                signal = SignalNormalizer.normalize_tradingview(webhook, provider_id, batch_now)
                 signals.append(signal)
             except (ValueError, TypeError) as e:
                 # Log error and skip this webhook
@@ -354,3 +483,17 @@ class SignalNormalizer:
                 "success": False,
                 "error": str(e),
             }
+
+
+# Bound pattern methods for the symbol hot path: one global load per call
+# instead of SignalNormalizer.<PATTERN>.<method> attribute chains
+_ASSET_CLASS_MATCH = SignalNormalizer.ASSET_CLASS_PATTERN.match
+_ASSET_CLASS_BY_GROUP = SignalNormalizer.ASSET_CLASS_BY_GROUP
+
+# Canonical ISO timestamps: "YYYY-MM-DDTHH:MM:SS" + "Z" or "+HH:MM"/"+HHMM",
+# or "YYYY-MM-DD HH:MM:SS"
+_ISO_TIMESTAMP_MATCH = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})([T ])(\d{2}):(\d{2}):(\d{2})"
+    r"(Z|([+-])(\d{2}):?([0-5]\d))?\Z",
+    re.ASCII,
+).match
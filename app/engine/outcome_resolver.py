@@ -22,9 +22,11 @@ Key concepts:
 - Duration: Time from entry to close
 """
 
+import math
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional
-from statistics import mean, stdev, median
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional, Sequence, Iterable, Iterator
 from dataclasses import dataclass, field
 
 from app.models.canonical_signal import (
@@ -37,6 +39,23 @@ from app.models.canonical_signal import (
 )
 
 
+# Direction -> sign applied to (exit - entry) when computing R
+_DIRECTION_SIGN = {
+    SignalDirection.LONG: 1.0,
+    SignalDirection.SHORT: -1.0,
+}
+
+# TP level -> bit in OutcomeBatch.tp_masks
+_TP_LEVEL_BITS = {1: 1, 2: 2, 3: 4}
+
+# TP event type -> take-profit level
+_TP_EVENT_LEVELS = {
+    EventType.TP1_HIT: 1,
+    EventType.TP2_HIT: 2,
+    EventType.TP3_HIT: 3,
+}
+
+
 @dataclass
 class TradeExcursion:
     """Track price excursions during a signal's lifetime."""
@@ -47,6 +66,41 @@ class TradeExcursion:
     adverse_pips: float = 0.0  # MAE as distance from entry
 
 
+@dataclass(frozen=True)
+class OutcomeBatch:
+    """
+    Column-wise (structure-of-arrays) view of a list of outcomes.
+
+    Holds only the fields provider aggregation reads, one tuple per column.
+    Frozen and hashable, so it doubles as the aggregate cache key.
+    """
+
+    results: Tuple[str, ...] = ()
+    r_values: Tuple[Optional[float], ...] = ()
+    tp_masks: Tuple[int, ...] = ()  # bit (level - 1) set per TP hit
+    durations: Tuple[Optional[float], ...] = ()
+
+    @classmethod
+    def from_outcomes(cls, outcomes: List[SignalOutcome]) -> "OutcomeBatch":
+        """Transpose SignalOutcome objects into columns in one pass."""
+        results = []
+        r_values = []
+        tp_masks = []
+        durations = []
+        for o in outcomes:
+            results.append(o.result)
+            r_values.append(o.r_value)
+            mask = 0
+            for level in o.tp_hits:
+                mask |= _TP_LEVEL_BITS.get(level, 0)
+            tp_masks.append(mask)
+            durations.append(o.duration_hours)
+        return cls(tuple(results), tuple(r_values), tuple(tp_masks), tuple(durations))
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+
 class OutcomeResolver:
     """
     Calculates outcomes and performance metrics for closed signals.
@@ -79,28 +133,32 @@ class OutcomeResolver:
         if signal.entry_price is None or signal.sl is None:
             raise ValueError("Signal missing required entry_price or sl")
 
-        # Find relevant events
-        entry_hit_event = None
-        tp_hits = []
-        sl_hit_event = None
-        close_event = None
-        price_events = []
+        # Find relevant events: route each event to its bucket with one dict
+        # lookup. TP1/TP2/TP3 share a bucket so hits keep their event order.
+        entry_hits: List[SignalEvent] = []
+        tp_events: List[SignalEvent] = []
+        sl_hits: List[SignalEvent] = []
+        closes: List[SignalEvent] = []
+        price_events: List[SignalEvent] = []
+        buckets = {
+            EventType.ENTRY_HIT: entry_hits,
+            EventType.TP1_HIT: tp_events,
+            EventType.TP2_HIT: tp_events,
+            EventType.TP3_HIT: tp_events,
+            EventType.SL_HIT: sl_hits,
+            EventType.MANUAL_CLOSE: closes,
+            EventType.PRICE_UPDATE: price_events,
+        }
 
         for event in events:
-            if event.event_type == EventType.ENTRY_HIT:
-                entry_hit_event = event
-            elif event.event_type == EventType.TP1_HIT:
-                tp_hits.append((1, event))
-            elif event.event_type == EventType.TP2_HIT:
-                tp_hits.append((2, event))
-            elif event.event_type == EventType.TP3_HIT:
-                tp_hits.append((3, event))
-            elif event.event_type == EventType.SL_HIT:
-                sl_hit_event = event
-            elif event.event_type == EventType.MANUAL_CLOSE:
-                close_event = event
-            elif event.event_type == EventType.PRICE_UPDATE:
-                price_events.append(event)
+            bucket = buckets.get(event.event_type)
+            if bucket is not None:
+                bucket.append(event)
+
+        entry_hit_event = entry_hits[-1] if entry_hits else None
+        sl_hit_event = sl_hits[-1] if sl_hits else None
+        close_event = closes[-1] if closes else None
+        tp_hits = [(_TP_EVENT_LEVELS[event.event_type], event) for event in tp_events]
 
         # Determine exit price and result
         exit_price: Optional[float] = None
@@ -148,14 +206,11 @@ class OutcomeResolver:
             duration = close_event.event_time - entry_hit_event.event_time
             duration_hours = duration.total_seconds() / 3600
         elif entry_hit_event and (sl_hit_event or tp_hits):
-            # Use earliest TP or SL hit for duration
-            close_time = None
-            if sl_hit_event:
-                close_time = sl_hit_event.event_time
-            if tp_hits:
-                tp_close_time = tp_hits[0][1].event_time
-                if close_time is None or tp_close_time < close_time:
-                    close_time = tp_close_time
+            # Use earliest TP or SL hit for duration (events may be unordered)
+            close_time = min(
+                (event.event_time for event in (sl_hit_event, *tp_events) if event is not None),
+                default=None,
+            )
             if close_time:
                 duration = close_time - entry_hit_event.event_time
                 duration_hours = duration.total_seconds() / 3600
@@ -196,15 +251,13 @@ class OutcomeResolver:
         Returns:
             R-value or None if unable to calculate
         """
-        if exit_price is None or signal.risk_distance is None or signal.risk_distance == 0:
+        risk_distance = signal.risk_distance
+        if exit_price is None or risk_distance is None or risk_distance == 0:
             return None
 
-        if signal.direction == SignalDirection.LONG:
-            profit_loss = exit_price - signal.entry_price
-        else:  # SHORT
-            profit_loss = signal.entry_price - exit_price
-
-        r_value = profit_loss / signal.risk_distance
+        # +1 for LONG, -1 for SHORT: one formula covers both directions
+        sign = _DIRECTION_SIGN.get(signal.direction, -1.0)
+        r_value = (exit_price - signal.entry_price) * sign / risk_distance
         return round(r_value, 4)
 
     @staticmethod
@@ -234,27 +287,28 @@ class OutcomeResolver:
         if not prices:
             return excursion
 
+        # One C-level pass each for the extremes, shared by both directions
+        highest = max(prices)
+        lowest = min(prices)
+        entry = signal.entry_price
+
         if signal.direction == SignalDirection.LONG:
             # Favorable = highest price above entry
-            highest = max(prices)
             excursion.max_favorable = highest
-            excursion.favorable_pips = highest - signal.entry_price
+            excursion.favorable_pips = highest - entry
 
             # Adverse = lowest price below entry
-            lowest = min(prices)
             excursion.max_adverse = lowest
-            excursion.adverse_pips = signal.entry_price - lowest
+            excursion.adverse_pips = entry - lowest
 
         else:  # SHORT
             # Favorable = lowest price below entry
-            lowest = min(prices)
             excursion.max_favorable = lowest
-            excursion.favorable_pips = signal.entry_price - lowest
+            excursion.favorable_pips = entry - lowest
 
             # Adverse = highest price above entry
-            highest = max(prices)
             excursion.max_adverse = highest
-            excursion.adverse_pips = highest - signal.entry_price
+            excursion.adverse_pips = highest - entry
 
         return excursion
 
@@ -279,24 +333,45 @@ class OutcomeResolver:
         if not outcomes:
             return ProviderStats(provider_id=provider_id)
 
-        # Categorize outcomes
-        wins = [o for o in outcomes if o.result == "WIN"]
-        losses = [o for o in outcomes if o.result == "LOSS"]
-        partials = [o for o in outcomes if o.result == "PARTIAL"]
-        closed = [o for o in outcomes if o.result == "CLOSED"]
-
-        # R-values
-        r_values = [o.r_value for o in outcomes if o.r_value is not None]
-        win_r_values = [o.r_value for o in wins if o.r_value is not None]
-        loss_r_values = [o.r_value for o in losses if o.r_value is not None]
+        # The column-wise batch is also the cache key, so repeated dashboard
+        # refreshes over the same outcomes are served from the memoized result
+        stats = _aggregate_stats_cached(OutcomeBatch.from_outcomes(outcomes))
+        return stats.model_copy(
+            update={"provider_id": provider_id, "calculated_at": datetime.utcnow()}
+        )
 
-        # Calculate statistics
-        total_signals = len(outcomes)
-        win_count = len(wins)
-        loss_count = len(losses)
-        partial_count = len(partials)
+    @staticmethod
+    def _aggregate_stats_impl(batch: OutcomeBatch) -> ProviderStats:
+        """
+        Compute ProviderStats from an OutcomeBatch.
 
-        win_rate = (win_count / total_signals * 100) if total_signals > 0 else 0.0
+        The returned stats carry an empty provider_id and no calculated_at;
+        the caller fills both in on its copy.
+        """
+        # Result counts in one C-level pass
+        result_counts = Counter(batch.results)
+        win_count = result_counts["WIN"]
+        loss_count = result_counts["LOSS"]
+        partial_count = result_counts["PARTIAL"]
+
+        # Partition R-values by result in a single pass; the sums/extremes
+        # below then run as C-level builtins over flat lists
+        r_values: List[float] = []
+        win_r_values: List[float] = []
+        loss_r_values: List[float] = []
+        r_buckets = {"WIN": win_r_values, "LOSS": loss_r_values}
+
+        for result, r_value in zip(batch.results, batch.r_values):
+            if r_value is not None:
+                r_values.append(r_value)
+                bucket = r_buckets.get(result)
+                if bucket is not None:
+                    bucket.append(r_value)
+
+        # Calculate statistics (callers never pass an empty batch)
+        total_signals = len(batch)
+
+        win_rate = win_count / total_signals * 100
         total_r = sum(r_values) if r_values else 0.0
         avg_r = (total_r / len(r_values)) if r_values else 0.0
 
@@ -304,28 +379,35 @@ class OutcomeResolver:
         worst_r = min(r_values) if r_values else 0.0
 
         # TP hit rates
-        tp1_hits = len([o for o in outcomes if 1 in o.tp_hits])
-        tp2_hits = len([o for o in outcomes if 2 in o.tp_hits])
-        tp3_hits = len([o for o in outcomes if 3 in o.tp_hits])
-
-        tp1_rate = (tp1_hits / total_signals * 100) if total_signals > 0 else 0.0
-        tp2_rate = (tp2_hits / total_signals * 100) if total_signals > 0 else 0.0
-        tp3_rate = (tp3_hits / total_signals * 100) if total_signals > 0 else 0.0
+        # At most 8 distinct masks, so count them once and read the bits off
+        tp1_hits = tp2_hits = tp3_hits = 0
+        for mask, count in Counter(batch.tp_masks).items():
+            if mask & 1:
+                tp1_hits += count
+            if mask & 2:
+                tp2_hits += count
+            if mask & 4:
+                tp3_hits += count
+
+        tp1_rate = tp1_hits / total_signals * 100
+        tp2_rate = tp2_hits / total_signals * 100
+        tp3_rate = tp3_hits / total_signals * 100
 
         # Profit factor: sum of wins / abs(sum of losses)
         win_r_sum = sum(win_r_values) if win_r_values else 0.0
         loss_r_sum = abs(sum(loss_r_values)) if loss_r_values else 0.01
         profit_factor = win_r_sum / loss_r_sum if loss_r_sum > 0 else (1.0 if win_r_sum > 0 else 0.0)
 
-        # Expectancy: average R-value (mathematical edge per trade)
-        expectancy = avg_r
+        # Expectancy: average R-value (mathematical edge per trade); rounded
+        # once and shared with avg_r below
+        expectancy = round(avg_r, 4)
 
         # Average duration
-        durations = [o.duration_hours for o in outcomes if o.duration_hours is not None]
-        avg_duration_hours = mean(durations) if durations else 0.0
+        durations = [d for d in batch.durations if d is not None]
+        avg_duration_hours = (sum(durations) / len(durations)) if durations else 0.0
 
         return ProviderStats(
-            provider_id=provider_id,
+            provider_id="",
             total_signals=total_signals,
             open_signals=0,  # Not included in this batch
             wins=win_count,
@@ -335,13 +417,12 @@ class OutcomeResolver:
             tp1_hit_rate=round(tp1_rate, 2),
             tp2_hit_rate=round(tp2_rate, 2),
             tp3_hit_rate=round(tp3_rate, 2),
-            avg_r=round(avg_r, 4),
+            avg_r=expectancy,
             total_r=round(total_r, 4),
             best_r=round(best_r, 4),
             worst_r=round(worst_r, 4),
-            expectancy=round(expectancy, 4),
+            expectancy=expectancy,
             avg_duration_hours=round(avg_duration_hours, 2),
-            calculated_at=datetime.utcnow(),
         )
 
     @staticmethod
@@ -370,10 +451,19 @@ class OutcomeResolver:
             Signal 2: -1.0R → Equity = $10,150
             etc.
         """
-        if not outcomes:
-            return []
+        return list(OutcomeResolver.iter_equity_curve(outcomes, starting_equity))
+
+    @staticmethod
+    def iter_equity_curve(
+        outcomes: Iterable[SignalOutcome],
+        starting_equity: float = 10000.0,
+    ) -> Iterator[Dict]:
+        """
+        Lazily yield the rows of build_equity_curve, one per outcome.
 
-        curve = []
+        Lets callers stream long histories straight into a serializer
+        without holding every row in memory.
+        """
         cumulative_r = 0.0
         risk_per_trade = starting_equity * 0.01  # 1% risk per trade
 
@@ -383,15 +473,34 @@ class OutcomeResolver:
 
             equity = starting_equity + (cumulative_r * risk_per_trade)
 
-            curve.append({
+            yield {
                 "date": outcome.closed_at.isoformat() if outcome.closed_at else None,
                 "cumulative_r": round(cumulative_r, 4),
                 "equity": round(equity, 2),
                 "r_value": outcome.r_value,
                 "signal_result": outcome.result,
-            })
+            }
+
+    @staticmethod
+    def _equity_array(
+        outcomes: List[SignalOutcome],
+        starting_equity: float,
+    ) -> List[float]:
+        """
+        Equity after each outcome, matching the `equity` column of
+        build_equity_curve without building the per-row dicts.
+        """
+        equities: List[float] = []
+        cumulative_r = 0.0
+        risk_per_trade = starting_equity * 0.01  # 1% risk per trade
 
-        return curve
+        for outcome in outcomes:
+            r_value = outcome.r_value
+            if r_value is not None:
+                cumulative_r += r_value
+            equities.append(round(starting_equity + (cumulative_r * risk_per_trade), 2))
+
+        return equities
 
     @staticmethod
     def calculate_drawdown_metrics(
@@ -408,9 +517,9 @@ class OutcomeResolver:
         Returns:
             Dictionary with drawdown metrics
         """
-        curve = OutcomeResolver.build_equity_curve(outcomes, starting_equity)
+        equities = OutcomeResolver._equity_array(outcomes, starting_equity)
 
-        if not curve:
+        if not equities:
             return {
                 "max_drawdown": 0.0,
                 "max_drawdown_pct": 0.0,
@@ -418,24 +527,24 @@ class OutcomeResolver:
                 "current_drawdown": 0.0,
             }
 
-        equities = [point["equity"] for point in curve]
+        # Single pass: track the running peak and the deepest drawdown; the
+        # percentage is only worked out when a new maximum is recorded
         peak = starting_equity
         max_drawdown = 0.0
         max_drawdown_pct = 0.0
+        equity = starting_equity
 
         for equity in equities:
             if equity > peak:
                 peak = equity
+                continue
             drawdown = peak - equity
-            drawdown_pct = (drawdown / peak * 100) if peak > 0 else 0.0
-
             if drawdown > max_drawdown:
                 max_drawdown = drawdown
-                max_drawdown_pct = drawdown_pct
+                max_drawdown_pct = (drawdown / peak * 100) if peak > 0 else 0.0
 
         # Current drawdown
-        current_equity = equities[-1] if equities else starting_equity
-        current_drawdown = peak - current_equity
+        current_drawdown = peak - equity
 
         return {
             "max_drawdown": round(max_drawdown, 2),
@@ -455,24 +564,29 @@ class OutcomeResolver:
         Returns:
             Dictionary mapping month (YYYY-MM) to ProviderStats
         """
-        monthly_groups: Dict[str, List[SignalOutcome]] = {}
+        # Group on an integer (year, month) key so strftime runs once per
+        # month rather than once per outcome; input order does not matter
+        monthly_groups: Dict[Tuple[int, int], List[SignalOutcome]] = {}
 
         for outcome in outcomes:
-            if outcome.closed_at:
-                month_key = outcome.closed_at.strftime("%Y-%m")
-                if month_key not in monthly_groups:
-                    monthly_groups[month_key] = []
-                monthly_groups[month_key].append(outcome)
+            closed_at = outcome.closed_at
+            if closed_at:
+                month_key = (closed_at.year, closed_at.month)
+                group = monthly_groups.get(month_key)
+                if group is None:
+                    monthly_groups[month_key] = [outcome]
+                else:
+                    group.append(outcome)
 
         result = {}
-        for month, month_outcomes in sorted(monthly_groups.items()):
+        for (year, month), month_outcomes in sorted(monthly_groups.items()):
             stats = OutcomeResolver.aggregate_provider_stats(month_outcomes, "")
-            result[month] = stats
+            result[f"{year:04d}-{month:02d}"] = stats
 
         return result
 
     @staticmethod
-    def get_consistency_score(r_values: List[float]) -> float:
+    def get_consistency_score(r_values: Sequence[float]) -> float:
         """
         Calculate a consistency score (0-100) based on R-value distribution.
 
@@ -480,19 +594,21 @@ class OutcomeResolver:
         Uses coefficient of variation: lower CV = more consistent.
 
         Args:
-            r_values: List of R-values from closed signals
+            r_values: R-values from closed signals (any sized sequence)
 
         Returns:
             Consistency score from 0-100
         """
-        if not r_values or len(r_values) < 2:
+        n = len(r_values)
+        if n < 2:
             return 0.0
 
-        avg = mean(r_values)
+        avg = sum(r_values) / n
         if avg == 0:
             return 0.0
 
-        std_dev = stdev(r_values)
+        # Sample standard deviation (n - 1), as statistics.stdev
+        std_dev = math.sqrt(sum((r - avg) ** 2 for r in r_values) / (n - 1))
         cv = std_dev / abs(avg)  # Coefficient of variation
 
         # Convert CV to 0-100 score
@@ -537,3 +653,14 @@ class OutcomeResolver:
                 "avg_r_delta": round(stats2.avg_r - stats1.avg_r, 4),
             },
         }
+
+
+@lru_cache(maxsize=256)
+def _aggregate_stats_cached(batch: OutcomeBatch) -> ProviderStats:
+    """
+    Memoized OutcomeResolver._aggregate_stats_impl.
+
+    Callers get a copy with provider_id / calculated_at filled in, so the
+    cached instance is never handed out or mutated.
+    """
+    return OutcomeResolver._aggregate_stats_impl(batch)
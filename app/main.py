@@ -12,16 +12,18 @@ Production:
 
 import logging
 import pathlib
+import ssl
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 
 from app.config import settings
 from app.price.price_manager import PriceManager
 from app.workers.price_monitor import PriceMonitorWorker
+from app.notifications.webhook_sender import close_http_client
 
 # Configure logging
 logging.basicConfig(
@@ -43,6 +45,7 @@ async def lifespan(app: FastAPI):
     logger.info("=" * 60)
     logger.info("Signal Bridge starting up...")
     logger.info("=" * 60)
+    logger.info(f"Crypto backend: {ssl.OPENSSL_VERSION}")
 
     # Initialize price feeds
     try:
@@ -66,6 +69,7 @@ async def lifespan(app: FastAPI):
     logger.info("Signal Bridge shutting down...")
     await price_monitor.stop()
     await price_manager.shutdown()
+    await close_http_client()
     logger.info("Signal Bridge stopped")
 
 
@@ -81,6 +85,7 @@ app = FastAPI(
     lifespan=lifespan,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS — allow TradingView and any frontend
@@ -6,7 +6,7 @@ All trading signals are normalized to these schemas regardless of source.
 from datetime import datetime, date
 from decimal import Decimal
 from enum import Enum
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Tuple
 from pydantic import BaseModel, Field, field_validator
 import uuid
 
@@ -65,6 +65,24 @@ class EventSource(str, Enum):
 # ---------- Core Models ----------
 
 
+def compute_risk_metrics(
+    entry_price: float,
+    sl: Optional[float],
+    tp1: Optional[float],
+) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Risk distance and RR ratio for a set of price levels.
+
+    Returns (risk_distance, rr_ratio); either is None when it can't be computed.
+    """
+    if sl is None:
+        return None, None
+    risk_distance = abs(entry_price - sl)
+    if risk_distance > 0 and tp1 is not None:
+        return risk_distance, round(abs(tp1 - entry_price) / risk_distance, 4)
+    return risk_distance, None
+
+
 class CanonicalSignal(BaseModel):
     """
     The universal signal format. Every signal source converts to this.
@@ -109,10 +127,10 @@ class CanonicalSignal(BaseModel):
         """
         if self.sl is None:
             return
-        self.risk_distance = abs(self.entry_price - self.sl)
-        if self.risk_distance > 0 and self.tp1 is not None:
-            tp1_distance = abs(self.tp1 - self.entry_price)
-            self.rr_ratio = round(tp1_distance / self.risk_distance, 4)
+        risk_distance, rr_ratio = compute_risk_metrics(self.entry_price, self.sl, self.tp1)
+        self.risk_distance = risk_distance
+        if rr_ratio is not None:
+            self.rr_ratio = rr_ratio
 
 
 class SignalEvent(BaseModel):
@@ -4,9 +4,9 @@ Handles asynchronous delivery of webhook notifications with retry logic and circ
 """
 
 import logging
-import hashlib
 import hmac
 import httpx
+import orjson
 import asyncio
 from datetime import datetime, timezone
 from typing import Optional, Dict
@@ -16,6 +16,26 @@ from app.database import get_supabase
 
 logger = logging.getLogger(__name__)
 
+# Shared client so repeated deliveries to the same host reuse keep-alive
+# connections (and their TLS sessions) instead of handshaking every time
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared outbound webhook HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=WebhookSender.REQUEST_TIMEOUT)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 @dataclass
 class NotificationPayload:
@@ -137,9 +157,8 @@ class WebhookSender:
             True if status code < 300, False otherwise
         """
         try:
-            # Serialize payload as JSON
-            import json
-            payload_json = json.dumps(payload, separators=(",", ":"))
+            # Serialize payload as compact JSON bytes (signed and sent as-is)
+            payload_json = orjson.dumps(payload)
 
             # Generate signature
             signature = self._generate_signature(payload_json, webhook_secret)
@@ -156,26 +175,25 @@ class WebhookSender:
                 request_headers.update(headers)
 
             # Send request
-            async with httpx.AsyncClient(timeout=self.REQUEST_TIMEOUT) as client:
-                response = await client.post(
-                    url,
-                    content=payload_json,
-                    headers=request_headers,
-                )
-
-                success = response.status_code < 300
-
-                # Log delivery
-                self._log_delivery(
-                    webhook_id=webhook_id,
-                    url=url,
-                    event_id=payload["event_id"],
-                    status_code=response.status_code,
-                    success=success,
-                    response_text=response.text[:200] if response.status_code >= 400 else None,
-                )
-
-                return success
+            response = await get_http_client().post(
+                url,
+                content=payload_json,
+                headers=request_headers,
+            )
+
+            success = response.status_code < 300
+
+            # Log delivery
+            self._log_delivery(
+                webhook_id=webhook_id,
+                url=url,
+                event_id=payload["event_id"],
+                status_code=response.status_code,
+                success=success,
+                response_text=response.text[:200] if response.status_code >= 400 else None,
+            )
+
+            return success
 
         except httpx.TimeoutException as e:
             logger.error(f"Webhook timeout: {webhook_id} | {url} | {e}")
@@ -188,23 +206,19 @@ class WebhookSender:
             return False
 
     @staticmethod
-    def _generate_signature(payload_json: str, webhook_secret: str) -> str:
+    def _generate_signature(payload_json: bytes, webhook_secret: str) -> str:
         """
         Generate HMAC-SHA256 signature for webhook payload.
 
         Args:
-            payload_json: JSON-serialized payload
+            payload_json: JSON-serialized payload bytes
             webhook_secret: Secret for HMAC signing
 
         Returns:
             Hex-encoded HMAC-SHA256 signature
         """
-        signature = hmac.new(
-            webhook_secret.encode(),
-            payload_json.encode(),
-            hashlib.sha256,
-        ).hexdigest()
-        return signature
+        # One-shot OpenSSL HMAC (no Python-level HMAC object)
+        return hmac.digest(webhook_secret.encode(), payload_json, "sha256").hex()
 
     @staticmethod
     def _log_delivery(
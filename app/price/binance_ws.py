@@ -4,10 +4,10 @@ Handles connection, reconnection with exponential backoff, and dynamic subscript
 """
 
 import asyncio
-import json
 import logging
 from datetime import datetime, timezone
 from typing import Optional, Dict, Set
+import orjson
 import websockets
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
@@ -159,9 +159,9 @@ class BinanceWebSocketManager:
                         break
 
                     try:
-                        data = json.loads(message)
+                        data = orjson.loads(message)
                         self._parse_ticker_data(symbol, data)
-                    except json.JSONDecodeError as e:
+                    except orjson.JSONDecodeError as e:
                         logger.warning(f"Failed to parse message from {symbol}: {e}")
                     except Exception as e:
                         logger.warning(f"Error processing ticker data for {symbol}: {e}")
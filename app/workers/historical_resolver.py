@@ -442,13 +442,17 @@ class HistoricalResolver:
 
         sb.table("canonical_signals").update(update_data).eq("id", signal_id).execute()
 
-        # Write events
-        for event in outcome.get("events", []):
-            sb.table("signal_events").insert({
+        # Write events in one bulk INSERT
+        events = [
+            {
                 "signal_id": signal_id,
                 "event_type": event["event_type"],
                 "price": event["price"],
                 "source": "HISTORICAL",
                 "event_time": event.get("candle_time", datetime.now(timezone.utc).isoformat()),
                 "metadata": {"candle_idx": event.get("candle_idx")},
-            }).execute()
+            }
+            for event in outcome.get("events", [])
+        ]
+        if events:
+            sb.table("signal_events").insert(events, returning="minimal").execute()
@@ -0,0 +1,13 @@
+-- ============================================================
+-- Signal Bridge - Provider signal counts
+-- Per-provider signal counts grouped by status, so the providers
+-- list can be served with a single query instead of 2N+1.
+-- ============================================================
+
+CREATE OR REPLACE VIEW provider_signal_counts AS
+SELECT
+    provider_id,
+    status,
+    COUNT(*) AS signal_count
+FROM canonical_signals
+GROUP BY provider_id, status;
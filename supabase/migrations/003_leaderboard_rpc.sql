@@ -0,0 +1,47 @@
+-- ============================================================
+-- Signal Bridge - Leaderboard RPC
+-- Aggregates closed-signal performance per active provider in
+-- Postgres. Called via sb.rpc("leaderboard", {"days": .., "lim": ..}).
+-- Metrics mirror calculate_performance_metrics in app/api/reports.py.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION leaderboard(days INT, lim INT)
+RETURNS TABLE (
+    provider_id     UUID,
+    provider_name   TEXT,
+    total_trades    BIGINT,
+    win_rate        DOUBLE PRECISION,
+    total_r_value   DOUBLE PRECISION,
+    expectancy      DOUBLE PRECISION
+)
+LANGUAGE sql STABLE AS $$
+    WITH closed AS (
+        SELECT
+            cs.provider_id,
+            COUNT(*) AS trades,
+            COUNT(*) FILTER (WHERE cs.status = 'TP3_HIT') AS wins,
+            SUM(CASE cs.status
+                    WHEN 'TP3_HIT' THEN COALESCE(cs.rr_ratio, 1)
+                    WHEN 'SL_HIT' THEN -1
+                    ELSE 0
+                END) AS total_r,
+            AVG(COALESCE(cs.rr_ratio, 1)) AS avg_rr
+        FROM canonical_signals cs
+        WHERE cs.status IN ('CLOSED', 'TP1_HIT', 'TP2_HIT', 'TP3_HIT', 'SL_HIT')
+          AND cs.closed_at >= NOW() - make_interval(days => days)
+          AND cs.closed_at <= NOW()
+        GROUP BY cs.provider_id
+    )
+    SELECT
+        c.provider_id,
+        p.name,
+        c.trades,
+        ROUND(c.wins * 100.0 / c.trades, 2)::DOUBLE PRECISION,
+        ROUND(c.total_r, 2)::DOUBLE PRECISION,
+        ROUND((c.wins::NUMERIC / c.trades) * c.avg_rr - (1 - c.wins::NUMERIC / c.trades), 4)::DOUBLE PRECISION
+    FROM closed c
+    JOIN providers p ON p.id = c.provider_id
+    WHERE p.is_active = TRUE
+    ORDER BY 5 DESC
+    LIMIT lim;
+$$;
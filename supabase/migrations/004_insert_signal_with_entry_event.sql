@@ -0,0 +1,38 @@
+-- ============================================================
+-- Signal Bridge - Atomic signal ingest RPC
+-- Inserts a canonical signal and its ENTRY_REGISTERED event in one
+-- transaction / one round-trip. Called via
+-- sb.rpc("insert_signal_with_entry_event", {"signal": .., "event": ..}).
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION insert_signal_with_entry_event(signal JSONB, event JSONB)
+RETURNS SETOF canonical_signals
+LANGUAGE plpgsql AS $$
+DECLARE
+    inserted canonical_signals;
+BEGIN
+    INSERT INTO canonical_signals (
+        id, provider_id, external_signal_id, strategy_name,
+        symbol, asset_class, direction,
+        entry_price, sl, tp1, tp2, tp3,
+        risk_distance, rr_ratio, status, entry_time,
+        raw_payload, validation_errors, validation_warnings, next_poll_at
+    )
+    SELECT
+        s.id, s.provider_id, s.external_signal_id, s.strategy_name,
+        s.symbol, s.asset_class, s.direction,
+        s.entry_price, s.sl, s.tp1, s.tp2, s.tp3,
+        s.risk_distance, s.rr_ratio, s.status, s.entry_time,
+        s.raw_payload, s.validation_errors, s.validation_warnings, s.next_poll_at
+    FROM jsonb_populate_record(NULL::canonical_signals, signal) s
+    RETURNING * INTO inserted;
+
+    INSERT INTO signal_events (signal_id, event_type, price, source, event_time, metadata)
+    SELECT
+        inserted.id, e.event_type, e.price, e.source, e.event_time,
+        COALESCE(e.metadata, '{}')
+    FROM jsonb_populate_record(NULL::signal_events, event) e;
+
+    RETURN NEXT inserted;
+END;
+$$;
@@ -0,0 +1,20 @@
+-- ============================================================
+-- Signal Bridge - Composite indexes for list/detail queries
+-- The signal list endpoints filter by status / provider_id and
+-- order by entry_time DESC; the detail endpoint pages events by
+-- signal_id ordered by event_time. These indexes let Postgres
+-- serve both as index range scans instead of sort-after-filter.
+--
+-- Migrations run inside a transaction, so CONCURRENTLY is not used
+-- here. On a large live table, run the statements by hand with
+-- CREATE INDEX CONCURRENTLY instead.
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS idx_signals_status_entry
+    ON canonical_signals (status, entry_time DESC);
+
+CREATE INDEX IF NOT EXISTS idx_signals_provider_status_entry
+    ON canonical_signals (provider_id, status, entry_time DESC);
+
+CREATE INDEX IF NOT EXISTS idx_events_signal_time
+    ON signal_events (signal_id, event_time);
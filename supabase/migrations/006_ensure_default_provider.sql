@@ -0,0 +1,47 @@
+-- ============================================================
+-- Signal Bridge - Default provider RPC
+-- Returns the oldest active provider, creating the "AutoBridge"
+-- provider if there is none, in one round-trip. Called via
+-- sb.rpc("ensure_default_provider", {}).
+--
+-- The generated API key and webhook secret are never handed out
+-- (same as the Python fallback), so they are drawn here and only
+-- their SHA-256 hashes are stored.
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION ensure_default_provider()
+RETURNS SETOF providers
+LANGUAGE plpgsql AS $$
+BEGIN
+    RETURN QUERY
+        SELECT * FROM providers
+        WHERE is_active
+        ORDER BY created_at
+        LIMIT 1;
+    IF FOUND THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+        INSERT INTO providers (name, description, api_key_hash, webhook_secret, is_active)
+        VALUES (
+            'AutoBridge',
+            'Auto-created provider for Signal Bridge',
+            encode(sha256(convert_to(replace(gen_random_uuid()::text || gen_random_uuid()::text, '-', ''), 'UTF8')), 'hex'),
+            encode(sha256(convert_to(replace(gen_random_uuid()::text || gen_random_uuid()::text, '-', ''), 'UTF8')), 'hex'),
+            TRUE
+        )
+        ON CONFLICT (name) DO NOTHING
+        RETURNING *;
+    IF FOUND THEN
+        RETURN;
+    END IF;
+
+    -- Lost a race with a concurrent insert: return the winner if active
+    RETURN QUERY
+        SELECT * FROM providers
+        WHERE is_active
+        ORDER BY created_at
+        LIMIT 1;
+END;
+$$;
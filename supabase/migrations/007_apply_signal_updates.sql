@@ -0,0 +1,40 @@
+-- ============================================================
+-- Signal Bridge - Batched signal transitions
+-- Inserts a batch of signal events and applies the matching per-signal
+-- status changes in one transaction / one round-trip. Used by the
+-- PineScript batch endpoint via
+-- sb.rpc("apply_signal_updates", {"events": [..], "updates": [{"id": .., "status": .., ...}]}).
+-- Keys left out of an update keep their current value.
+-- ============================================================
+
+-- Replaces the earlier updates-only signature
+DROP FUNCTION IF EXISTS apply_signal_updates(JSONB);
+
+CREATE OR REPLACE FUNCTION apply_signal_updates(events JSONB, updates JSONB)
+RETURNS VOID
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO signal_events (signal_id, event_type, price, source, event_time, metadata)
+    SELECT
+        e.signal_id, e.event_type, e.price, e.source, e.event_time,
+        COALESCE(e.metadata, '{}')
+    FROM jsonb_populate_recordset(NULL::signal_events, events) e;
+
+    UPDATE canonical_signals c
+    SET
+        status       = u.status::signal_status,
+        activated_at = COALESCE(u.activated_at, c.activated_at),
+        closed_at    = COALESCE(u.closed_at, c.closed_at),
+        close_reason = COALESCE(u.close_reason, c.close_reason),
+        exit_price   = COALESCE(u.exit_price, c.exit_price)
+    FROM jsonb_to_recordset(updates) AS u(
+        id UUID,
+        status TEXT,
+        activated_at TIMESTAMPTZ,
+        closed_at TIMESTAMPTZ,
+        close_reason TEXT,
+        exit_price NUMERIC
+    )
+    WHERE c.id = u.id;
+END;
+$$;
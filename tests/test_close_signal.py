@@ -0,0 +1,89 @@
+"""
+Tests for the conditional manual close in app.api.signals.close_signal,
+run against an in-memory stand-in for the supabase client.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import signals
+
+
+class _FakeQuery:
+    """Applies eq/neq filters to the fake signal table on execute()."""
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.op = None
+        self.payload = None
+        self.filters = []
+
+    def select(self, *args, **kwargs):
+        self.op = "select"
+        return self
+
+    def update(self, data):
+        self.op, self.payload = "update", data
+        return self
+
+    def insert(self, data, **kwargs):
+        self.op, self.payload = "insert", data
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def execute(self):
+        if self.name == "signal_events":
+            self.client.events.append(self.payload)
+            return SimpleNamespace(data=[])
+        rows = [row for row in self.client.rows if all(f(row) for f in self.filters)]
+        if self.op == "update":
+            for row in rows:
+                row.update(self.payload)
+        return SimpleNamespace(data=[dict(row) for row in rows])
+
+
+class _FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.events = []
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+
+def _close(monkeypatch, rows, signal_id):
+    client = _FakeSupabase(rows)
+    monkeypatch.setattr(signals, "get_supabase", lambda: client)
+    return client, asyncio.run(signals.close_signal(signal_id))
+
+
+def test_close_open_signal(monkeypatch):
+    client, response = _close(monkeypatch, [{"id": "sig_a", "status": "ACTIVE"}], "sig_a")
+
+    assert response["status"] == "closed"
+    assert client.rows[0]["status"] == "CLOSED"
+    assert client.rows[0]["close_reason"] == "MANUAL_CLOSE"
+    assert [event["event_type"] for event in client.events] == ["MANUAL_CLOSE"]
+
+
+def test_close_already_closed_signal(monkeypatch):
+    with pytest.raises(HTTPException) as exc:
+        _close(monkeypatch, [{"id": "sig_a", "status": "CLOSED"}], "sig_a")
+    assert exc.value.status_code == 400
+
+
+def test_close_missing_signal(monkeypatch):
+    with pytest.raises(HTTPException) as exc:
+        _close(monkeypatch, [{"id": "sig_a", "status": "ACTIVE"}], "sig_missing")
+    assert exc.value.status_code == 404
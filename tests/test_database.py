@@ -0,0 +1,39 @@
+"""
+Tests for the query helpers in app.database.
+"""
+
+import asyncio
+import threading
+import time
+
+from app import database
+
+
+def _run_burst(calls):
+    """Issue `calls` concurrent run_query calls; return the peak in flight."""
+    lock = threading.Lock()
+    state = {"in_flight": 0, "peak": 0}
+
+    def blocking_query():
+        with lock:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+        time.sleep(0.01)
+        with lock:
+            state["in_flight"] -= 1
+
+    async def burst():
+        await asyncio.gather(*(database.run_query(blocking_query) for _ in range(calls)))
+
+    asyncio.run(burst())
+    return state["peak"]
+
+
+def test_run_query_bounds_concurrency_on_every_loop(monkeypatch):
+    monkeypatch.setattr(database.settings, "supabase_max_concurrency", 2)
+    monkeypatch.setattr(database, "_query_semaphores", database.weakref.WeakKeyDictionary())
+
+    # Each asyncio.run() is a fresh loop; contention on the second one must
+    # not trip over a semaphore bound to the first
+    assert _run_burst(6) == 2
+    assert _run_burst(6) == 2
@@ -0,0 +1,57 @@
+"""
+Tests for the leaderboard response cache in app.api.reports.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.api import reports
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Replace the blocking build with a slow stand-in that records its calls."""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_build(days, limit):
+        with lock:
+            calls.append((days, limit))
+        time.sleep(0.05)
+        return reports.LeaderboardResponse(period=f"Last {days} days", entries=[])
+
+    monkeypatch.setattr(reports, "_build_leaderboard", fake_build)
+    reports._leaderboard_cache.clear()
+    yield calls
+    reports._leaderboard_cache.clear()
+
+
+def test_concurrent_misses_share_one_build(builds):
+    async def scenario():
+        return await asyncio.gather(*(reports.get_leaderboard(days=30, limit=20) for _ in range(5)))
+
+    responses = asyncio.run(scenario())
+    assert builds == [(30, 20)]
+    assert all(response is responses[0] for response in responses)
+    assert not reports._leaderboard_inflight
+
+
+def test_different_keys_build_concurrently(builds):
+    async def scenario():
+        await asyncio.gather(
+            reports.get_leaderboard(days=7, limit=20),
+            reports.get_leaderboard(days=30, limit=20),
+        )
+
+    asyncio.run(scenario())
+    assert sorted(builds) == [(7, 20), (30, 20)]
+
+
+def test_works_across_event_loops(builds):
+    asyncio.run(reports.get_leaderboard(days=30, limit=20))
+    reports._leaderboard_cache.clear()
+    asyncio.run(reports.get_leaderboard(days=30, limit=20))
+    assert builds == [(30, 20), (30, 20)]
@@ -0,0 +1,82 @@
+"""
+Tests for SignalNormalizer timestamp parsing.
+
+The regex fast path in _parse_timestamp_impl must agree with the original
+strptime / epoch parsing for every input it accepts.
+"""
+
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from app.engine.normalizer import SignalNormalizer
+
+
+def _reference_parse_timestamp(timestamp_str: str):
+    """The original strptime/epoch parser; None where it fell back to now."""
+    for fmt in ("%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%d %H:%M:%S"):
+        try:
+            dt = datetime.strptime(timestamp_str, fmt)
+            return dt.replace(tzinfo=None) if dt.tzinfo is None else dt
+        except ValueError:
+            continue
+    try:
+        epoch_seconds = float(timestamp_str)
+        if 0 < epoch_seconds < 10**10:
+            return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).replace(tzinfo=None)
+    except (ValueError, OSError):
+        pass
+    return None
+
+
+@pytest.mark.parametrize("text", [
+    "2024-02-13T12:34:56Z",
+    "2024-02-13T12:34:56+00:00",
+    "2024-02-13T12:34:56-05:30",
+    "2024-02-13T12:34:56+0530",
+    "2024-02-13 12:34:56",
+    "2024-02-13T12:34:56",
+    "2024-02-13 12:34:56Z",
+    "2024-2-3T1:2:3Z",
+    "2024-02-30T12:34:56Z",
+    "2024-02-13T24:00:00Z",
+    "2024-02-13T12:34:56+24:00",
+    "2024-02-13T12:34:56.123Z",
+    "1707826496",
+    "1707826496.5",
+    "0",
+    "-5",
+    "99999999999",
+    "１７０７８２６４９６",
+    "not a timestamp",
+])
+def test_parse_timestamp_matches_reference(text):
+    assert SignalNormalizer._parse_timestamp_impl(text) == _reference_parse_timestamp(text)
+
+
+def test_randomized_timestamps_match_reference():
+    rng = random.Random(1707826496)
+    suffixes = ["", "Z", "+00:00", "-05:30", "+0530", "+23:59", "+24:00", "-00:60", "z", " "]
+    for _ in range(5000):
+        text = "{:04d}-{:02d}-{:02d}{}{:02d}:{:02d}:{:02d}{}".format(
+            rng.randint(1, 9999), rng.randint(0, 13), rng.randint(0, 32),
+            rng.choice(["T", " ", "t"]),
+            rng.randint(0, 24), rng.randint(0, 60), rng.randint(0, 61),
+            rng.choice(suffixes),
+        )
+        assert SignalNormalizer._parse_timestamp_impl(text) == _reference_parse_timestamp(text), text
+
+
+def test_missing_or_unparseable_timestamp_uses_fallback():
+    now = datetime(2024, 2, 13, 12, 0, 0)
+    assert SignalNormalizer._parse_timestamp(None, now=now) is now
+    assert SignalNormalizer._parse_timestamp("", now=now) is now
+    assert SignalNormalizer._parse_timestamp("garbage", now=now) is now
+
+
+def test_epoch_is_naive_utc_like_z_suffix():
+    from_epoch = SignalNormalizer._parse_timestamp_impl("1707826496")
+    assert from_epoch.tzinfo is None
+    assert from_epoch == SignalNormalizer._parse_timestamp_impl("2024-02-13T12:14:56Z")
+    assert SignalNormalizer._parse_timestamp_impl("1707826496.5") == from_epoch.replace(microsecond=500000)
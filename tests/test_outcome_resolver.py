@@ -0,0 +1,243 @@
+"""
+Tests for app.engine.outcome_resolver.
+
+The column-wise / bitmask aggregation and the single-pass equity and
+drawdown helpers are checked against straightforward re-implementations of
+the original list-comprehension logic.
+"""
+
+import random
+import statistics
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.engine.outcome_resolver import OutcomeBatch, OutcomeResolver
+from app.models.canonical_signal import (
+    CanonicalSignal,
+    EventSource,
+    EventType,
+    SignalDirection,
+    SignalEvent,
+    SignalOutcome,
+)
+
+T0 = datetime(2024, 1, 1)
+
+
+def _reference_aggregate(outcomes):
+    """Original aggregate_provider_stats arithmetic, one list per category."""
+    total = len(outcomes)
+    wins = [o for o in outcomes if o.result == "WIN"]
+    losses = [o for o in outcomes if o.result == "LOSS"]
+    partials = [o for o in outcomes if o.result == "PARTIAL"]
+    r_values = [o.r_value for o in outcomes if o.r_value is not None]
+    total_r = sum(r_values) if r_values else 0.0
+    avg_r = (total_r / len(r_values)) if r_values else 0.0
+    durations = [o.duration_hours for o in outcomes if o.duration_hours is not None]
+    return {
+        "total_signals": total,
+        "wins": len(wins),
+        "losses": len(losses),
+        "partials": len(partials),
+        "win_rate": round(len(wins) / total * 100, 2),
+        "tp1_hit_rate": round(len([o for o in outcomes if 1 in o.tp_hits]) / total * 100, 2),
+        "tp2_hit_rate": round(len([o for o in outcomes if 2 in o.tp_hits]) / total * 100, 2),
+        "tp3_hit_rate": round(len([o for o in outcomes if 3 in o.tp_hits]) / total * 100, 2),
+        "avg_r": round(avg_r, 4),
+        "total_r": round(total_r, 4),
+        "best_r": round(max(r_values) if r_values else 0.0, 4),
+        "worst_r": round(min(r_values) if r_values else 0.0, 4),
+        "expectancy": round(avg_r, 4),
+        "avg_duration_hours": round(statistics.mean(durations), 2) if durations else 0.0,
+    }
+
+
+def _random_outcomes(rng, count):
+    return [
+        SignalOutcome(
+            signal_id=f"sig_{i}",
+            result=rng.choice(["WIN", "LOSS", "PARTIAL", "CLOSED", "OPEN"]),
+            entry_price=100.0,
+            r_value=rng.choice([None, 0.0, round(rng.uniform(-1.0, 4.0), 4)]),
+            tp_hits=sorted(rng.sample([1, 2, 3], rng.randint(0, 3))),
+            duration_hours=rng.choice([None, round(rng.uniform(0.0, 100.0), 3)]),
+            closed_at=rng.choice([None, T0 + timedelta(days=rng.randint(0, 400))]),
+        )
+        for i in range(count)
+    ]
+
+
+# ============================================================================
+# Provider aggregation
+# ============================================================================
+
+def test_aggregate_matches_reference():
+    rng = random.Random(42)
+    for _ in range(300):
+        outcomes = _random_outcomes(rng, rng.randint(1, 40))
+        stats = OutcomeResolver.aggregate_provider_stats(outcomes, "prov")
+        expected = _reference_aggregate(outcomes)
+        # sum/len vs. statistics.mean can land either side of a rounding
+        # boundary, so the 2-dp duration may differ by one step
+        assert stats.avg_duration_hours == pytest.approx(expected.pop("avg_duration_hours"), abs=0.01 + 1e-9)
+        actual = {field: getattr(stats, field) for field in expected}
+        assert actual == pytest.approx(expected)
+        assert stats.provider_id == "prov"
+        assert stats.calculated_at is not None
+
+
+def test_aggregate_empty():
+    stats = OutcomeResolver.aggregate_provider_stats([], "prov")
+    assert stats.provider_id == "prov"
+    assert stats.total_signals == 0
+
+
+def test_outcome_batch_tp_masks():
+    outcomes = [
+        SignalOutcome(signal_id="a", result="WIN", entry_price=1.0, tp_hits=[1, 3]),
+        SignalOutcome(signal_id="b", result="WIN", entry_price=1.0, tp_hits=[]),
+        SignalOutcome(signal_id="c", result="WIN", entry_price=1.0, tp_hits=[1, 2, 3]),
+    ]
+    batch = OutcomeBatch.from_outcomes(outcomes)
+    assert batch.tp_masks == (0b101, 0, 0b111)
+    assert len(batch) == 3
+
+
+def test_cached_aggregate_is_not_shared_between_callers():
+    outcomes = _random_outcomes(random.Random(3), 10)
+    first = OutcomeResolver.aggregate_provider_stats(outcomes, "a")
+    second = OutcomeResolver.aggregate_provider_stats(outcomes, "b")
+    assert first is not second
+    assert (first.provider_id, second.provider_id) == ("a", "b")
+    assert first.model_dump(exclude={"provider_id", "calculated_at"}) == \
+        second.model_dump(exclude={"provider_id", "calculated_at"})
+
+
+# ============================================================================
+# Equity curve, drawdown, monthly breakdown, consistency
+# ============================================================================
+
+def _reference_drawdown(curve, starting_equity):
+    equities = [point["equity"] for point in curve]
+    peak = starting_equity
+    max_drawdown = max_drawdown_pct = 0.0
+    for equity in equities:
+        if equity > peak:
+            peak = equity
+        drawdown = peak - equity
+        drawdown_pct = (drawdown / peak * 100) if peak > 0 else 0.0
+        if drawdown > max_drawdown:
+            max_drawdown, max_drawdown_pct = drawdown, drawdown_pct
+    return {
+        "max_drawdown": round(max_drawdown, 2),
+        "max_drawdown_pct": round(max_drawdown_pct, 2),
+        "current_drawdown": round(peak - equities[-1], 2),
+        "peak_equity": round(peak, 2),
+    }
+
+
+def test_drawdown_matches_reference():
+    rng = random.Random(11)
+    for _ in range(200):
+        outcomes = _random_outcomes(rng, rng.randint(1, 40))
+        curve = OutcomeResolver.build_equity_curve(outcomes, 10000.0)
+        assert OutcomeResolver.calculate_drawdown_metrics(outcomes, 10000.0) == _reference_drawdown(curve, 10000.0)
+
+
+def test_equity_curve_variants_agree():
+    outcomes = _random_outcomes(random.Random(5), 30)
+    curve = OutcomeResolver.build_equity_curve(outcomes)
+    assert list(OutcomeResolver.iter_equity_curve(iter(outcomes))) == curve
+
+
+def test_monthly_breakdown_groups_unsorted_outcomes():
+    outcomes = _random_outcomes(random.Random(9), 60)
+    random.Random(1).shuffle(outcomes)
+    breakdown = OutcomeResolver.calculate_monthly_breakdown(outcomes)
+
+    expected_months = sorted({o.closed_at.strftime("%Y-%m") for o in outcomes if o.closed_at})
+    assert list(breakdown) == expected_months
+    for month, stats in breakdown.items():
+        in_month = [o for o in outcomes if o.closed_at and o.closed_at.strftime("%Y-%m") == month]
+        assert stats.total_signals == len(in_month)
+
+
+def test_consistency_score_matches_statistics():
+    rng = random.Random(13)
+    for _ in range(200):
+        r_values = [round(rng.uniform(-1.0, 4.0), 4) for _ in range(rng.randint(2, 50))]
+        avg = statistics.mean(r_values)
+        cv = statistics.stdev(r_values) / abs(avg)
+        expected = round(max(0, min(100, 100 - (cv * 25))), 1)
+        assert OutcomeResolver.get_consistency_score(r_values) == pytest.approx(expected, abs=0.1)
+    assert OutcomeResolver.get_consistency_score([1.0]) == 0.0
+    assert OutcomeResolver.get_consistency_score(()) == 0.0
+
+
+# ============================================================================
+# R-values and signal resolution
+# ============================================================================
+
+def _signal(direction, entry=100.0, sl=90.0):
+    signal = CanonicalSignal(
+        provider_id="prov", symbol="NQ", direction=direction,
+        entry_price=entry, sl=sl, tp1=120.0, tp2=130.0, tp3=140.0, entry_time=T0,
+    )
+    signal.calculate_risk_metrics()
+    return signal
+
+
+def _event(event_type, price, hours):
+    return SignalEvent(
+        signal_id="sig", event_type=event_type, price=price,
+        source=EventSource.PINESCRIPT, event_time=T0 + timedelta(hours=hours),
+    )
+
+
+def test_r_value_by_direction():
+    assert OutcomeResolver.calculate_r_value(_signal(SignalDirection.LONG), 120.0) == 2.0
+    assert OutcomeResolver.calculate_r_value(_signal(SignalDirection.SHORT, sl=110.0), 80.0) == 2.0
+    assert OutcomeResolver.calculate_r_value(_signal(SignalDirection.SHORT, sl=110.0), 110.0) == -1.0
+    assert OutcomeResolver.calculate_r_value(_signal(SignalDirection.LONG), None) is None
+
+
+def test_resolve_partial_win():
+    events = [
+        _event(EventType.ENTRY_HIT, 100.0, 0),
+        _event(EventType.PRICE_UPDATE, 125.0, 1),
+        _event(EventType.TP1_HIT, 120.0, 2),
+        _event(EventType.PRICE_UPDATE, 88.0, 3),
+        _event(EventType.SL_HIT, 90.0, 4),
+    ]
+    outcome = OutcomeResolver.resolve_signal(_signal(SignalDirection.LONG), events)
+    assert outcome.result == "PARTIAL"
+    assert outcome.tp_hits == [1]
+    assert outcome.exit_price == 90.0
+    assert outcome.r_value == -1.0
+    assert outcome.max_favorable_excursion == 25.0
+    assert outcome.max_adverse_excursion == 12.0
+    assert outcome.duration_hours == 2.0
+
+
+def test_resolve_win_exits_at_last_tp():
+    events = [
+        _event(EventType.ENTRY_HIT, 100.0, 0),
+        _event(EventType.TP1_HIT, 120.0, 1),
+        _event(EventType.TP2_HIT, None, 2),
+    ]
+    outcome = OutcomeResolver.resolve_signal(_signal(SignalDirection.LONG), events)
+    assert outcome.result == "WIN"
+    assert outcome.tp_hits == [1, 2]
+    assert outcome.exit_price == 130.0
+    assert outcome.r_value == 3.0
+
+
+def test_resolve_duration_uses_earliest_hit_for_unordered_events():
+    events = [
+        _event(EventType.ENTRY_HIT, 100.0, 0),
+        _event(EventType.TP2_HIT, 130.0, 6),
+        _event(EventType.TP1_HIT, 120.0, 3),
+    ]
+    outcome = OutcomeResolver.resolve_signal(_signal(SignalDirection.LONG), events)
+    assert outcome.duration_hours == 3.0
@@ -0,0 +1,156 @@
+"""
+Tests for the PineScript batch ingest path in app.api.webhook_ingest,
+run against an in-memory stand-in for the supabase client.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from postgrest.exceptions import APIError
+
+from app.api import webhook_ingest
+
+
+class _FakeQuery:
+    """Records the builder calls a query makes and answers execute()."""
+
+    def __init__(self, client, name, params=None):
+        self.client = client
+        self.name = name
+        self.params = params
+        self.ids = None
+        self.rows = None
+        self.update_data = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def in_(self, column, values):
+        self.ids = list(values)
+        return self
+
+    def insert(self, rows, **kwargs):
+        self.rows = rows
+        return self
+
+    def update(self, data):
+        self.update_data = data
+        return self
+
+    def eq(self, column, value):
+        self.ids = [value]
+        return self
+
+    def execute(self):
+        if self.name == "canonical_signals" and self.update_data is not None:
+            self.client.updates.append({"id": self.ids[0], **self.update_data})
+            return SimpleNamespace(data=[])
+        if self.name == "canonical_signals" and self.ids is not None:
+            self.client.lookups.append(self.ids)
+            return SimpleNamespace(data=[
+                {"id": signal_id, "status": self.client.statuses[signal_id]}
+                for signal_id in self.ids
+                if signal_id in self.client.statuses
+            ])
+        if self.name == "signal_events":
+            self.client.inserted.extend(self.rows)
+            return SimpleNamespace(data=[])
+        if self.name == "rpc:apply_signal_updates":
+            if self.client.rpc_error:
+                raise APIError(self.client.rpc_error)
+            self.client.inserted.extend(self.params["events"])
+            self.client.updates.extend(self.params["updates"])
+            return SimpleNamespace(data=[])
+        raise AssertionError(f"unexpected query on {self.name}")
+
+
+class _FakeSupabase:
+    def __init__(self, statuses, rpc_error=None):
+        self.statuses = statuses
+        self.rpc_error = rpc_error
+        self.lookups = []
+        self.inserted = []
+        self.updates = []
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+    def rpc(self, fn, params):
+        return _FakeQuery(self, f"rpc:{fn}", params)
+
+
+def _event(signal_id, event_type, price=100.0):
+    return {"signal_id": signal_id, "event_type": event_type, "price": price, "symbol": "NQ"}
+
+
+def _run_batch(monkeypatch, statuses, events, rpc_error=None):
+    client = _FakeSupabase(statuses, rpc_error)
+    monkeypatch.setattr(webhook_ingest, "get_supabase", lambda: client)
+    monkeypatch.setattr(webhook_ingest, "_signal_updates_rpc_available", True)
+    response = asyncio.run(webhook_ingest._ingest_pinescript_batch(orjson.dumps(events)))
+    return client, response
+
+
+def test_signal_lookup_is_chunked(monkeypatch):
+    signal_ids = [f"sig_{i:04d}" for i in range(250)]
+    statuses = {signal_id: "PENDING" for signal_id in signal_ids}
+
+    client, response = _run_batch(monkeypatch, statuses, [_event(s, "ENTRY_HIT") for s in signal_ids])
+
+    assert [len(ids) for ids in client.lookups] == [100, 100, 50]
+    assert sorted(i for ids in client.lookups for i in ids) == signal_ids
+    assert response["transitions"] == 250
+    assert {update["status"] for update in client.updates} == {"ACTIVE"}
+
+
+def test_events_for_one_signal_chain_in_order(monkeypatch):
+    client, response = _run_batch(monkeypatch, {"sig_a": "PENDING"}, [
+        _event("sig_a", "ENTRY_HIT", 100.0),
+        _event("sig_a", "TP1_HIT", 110.0),
+        _event("sig_missing", "SL_HIT", 90.0),
+    ])
+
+    assert [r["status"] for r in response["results"]] == ["processed", "processed", "not_found"]
+    assert [r["new_status"] for r in response["results"][:2]] == ["ACTIVE", "TP1_HIT"]
+    assert [row["event_type"] for row in client.inserted] == ["ENTRY_HIT", "TP1_HIT"]
+    # One merged update per signal, carrying the final status
+    assert len(client.updates) == 1
+    assert client.updates[0]["id"] == "sig_a"
+    assert client.updates[0]["status"] == "TP1_HIT"
+    assert "activated_at" in client.updates[0]
+
+
+def test_unknown_event_type_and_status_are_reported(monkeypatch):
+    client, response = _run_batch(monkeypatch, {"sig_a": "PENDING", "sig_b": "ARCHIVED"}, [
+        _event("sig_a", "TP9_HIT"),
+        _event("sig_b", "ENTRY_HIT"),
+        _event("sig_a", "ENTRY_HIT"),
+    ])
+
+    assert [r["status"] for r in response["results"]] == ["invalid_event_type", "invalid_status", "processed"]
+    assert [row["signal_id"] for row in client.inserted] == ["sig_a"]
+
+
+def test_missing_rpc_falls_back_to_separate_writes(monkeypatch):
+    client, response = _run_batch(
+        monkeypatch, {"sig_a": "PENDING"}, [_event("sig_a", "ENTRY_HIT")],
+        rpc_error={"code": "PGRST202", "message": "Could not find the function"},
+    )
+
+    assert response["transitions"] == 1
+    assert [row["event_type"] for row in client.inserted] == ["ENTRY_HIT"]
+    assert [(u["id"], u["status"]) for u in client.updates] == [("sig_a", "ACTIVE")]
+    assert not webhook_ingest._signal_updates_rpc_available
+
+
+def test_other_rpc_errors_are_not_retried_separately(monkeypatch):
+    with pytest.raises(HTTPException) as exc:
+        _run_batch(
+            monkeypatch, {"sig_a": "PENDING"}, [_event("sig_a", "ENTRY_HIT")],
+            rpc_error={"code": "57014", "message": "statement timeout"},
+        )
+    assert exc.value.status_code == 500
+    assert webhook_ingest._signal_updates_rpc_available
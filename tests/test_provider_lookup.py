@@ -0,0 +1,71 @@
+"""
+Tests for provider resolution in app.api.webhook_ingest._find_provider,
+run against an in-memory stand-in for the supabase client.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.api import webhook_ingest
+from app.api.providers import invalidate_provider_cache
+
+
+class _FakeQuery:
+    """Records the or_() filter and answers with the configured rows."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def or_(self, filters):
+        self.client.filters.append(filters)
+        return self
+
+    def limit(self, count):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.client.rows)
+
+
+class _FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+
+    def table(self, name):
+        return _FakeQuery(self)
+
+
+@pytest.fixture(autouse=True)
+def _clear_provider_cache():
+    invalidate_provider_cache()
+    yield
+    invalidate_provider_cache()
+
+
+def _find(client, **kwargs):
+    return asyncio.run(webhook_ingest._find_provider(client, **kwargs))
+
+
+def test_name_lookup_is_quoted_and_cached():
+    client = _FakeSupabase([{"id": "prov", "name": 'Acme "FX"', "api_key_hash": None}])
+
+    assert _find(client, name='Acme "FX"')["id"] == "prov"
+    assert _find(client, name='Acme "FX"')["id"] == "prov"
+    assert client.filters == ['name.eq."Acme \\"FX\\""']
+
+
+@pytest.mark.parametrize("name", [123, 1.5, {"name": "Acme"}, ["Acme"], True])
+def test_non_string_name_is_ignored(name):
+    client = _FakeSupabase([{"id": "prov", "name": "Acme", "api_key_hash": None}])
+
+    assert _find(client, name=name) is None
+    assert client.filters == []
@@ -0,0 +1,167 @@
+"""
+Tests for the RPC-with-fallback helpers: only a missing Postgres function
+(PostgREST PGRST202) may trigger the fallback, anything else propagates.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import BackgroundTasks
+from postgrest.exceptions import APIError
+
+from app.api import reports, webhook_ingest
+from app.api.providers import invalidate_provider_cache
+from app.database import is_missing_function
+
+MISSING_FUNCTION = {"code": "PGRST202", "message": "Could not find the function"}
+TIMEOUT = {"code": "57014", "message": "canceling statement due to statement timeout"}
+
+
+class _FailingRpc:
+    """Answers every rpc() call by raising the given error."""
+
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def rpc(self, fn, params):
+        self.calls += 1
+        return self
+
+    def execute(self):
+        raise APIError(self.error)
+
+
+def test_is_missing_function():
+    assert is_missing_function(APIError(MISSING_FUNCTION))
+    assert is_missing_function(SimpleNamespace(code=404))
+    assert not is_missing_function(APIError(TIMEOUT))
+    assert not is_missing_function(RuntimeError("connection reset"))
+
+
+def test_leaderboard_falls_back_only_when_function_missing(monkeypatch):
+    monkeypatch.setattr(reports, "_leaderboard_rpc_available", True)
+    client = _FailingRpc(MISSING_FUNCTION)
+
+    assert reports.get_leaderboard_rows(client, 30, 10) is None
+    # Remembered, so the RPC is not retried on the next call
+    assert reports.get_leaderboard_rows(client, 30, 10) is None
+    assert client.calls == 1
+
+
+def test_leaderboard_reraises_other_errors(monkeypatch):
+    monkeypatch.setattr(reports, "_leaderboard_rpc_available", True)
+    with pytest.raises(APIError):
+        reports.get_leaderboard_rows(_FailingRpc(TIMEOUT), 30, 10)
+    assert reports._leaderboard_rpc_available
+
+
+# ============================================================================
+# Signal + entry event ingest
+# ============================================================================
+
+@pytest.fixture
+def two_step_insert(monkeypatch):
+    """Stub the separate signal insert and record when it is used."""
+    stored = []
+
+    async def fake_store_signal(sb, signal, validation, now_iso):
+        stored.append(signal.id)
+        return {"id": signal.id}
+
+    monkeypatch.setattr(webhook_ingest, "_signal_row", lambda signal, validation, now_iso: {"id": signal.id})
+    monkeypatch.setattr(webhook_ingest, "_store_signal", fake_store_signal)
+    monkeypatch.setattr(webhook_ingest, "_ingest_rpc_available", True)
+    return stored
+
+
+def _store(client):
+    signal = SimpleNamespace(id="sig_a")
+    tasks = BackgroundTasks()
+    data = asyncio.run(webhook_ingest._store_signal_with_event(client, signal, None, "now", {"event_type": "ENTRY_REGISTERED"}, tasks))
+    return data, tasks
+
+
+def test_ingest_falls_back_when_function_missing(two_step_insert):
+    client = _FailingRpc(MISSING_FUNCTION)
+
+    assert _store(client)[0] == {"id": "sig_a"}
+    _, tasks = _store(client)
+    assert two_step_insert == ["sig_a", "sig_a"]
+    assert len(tasks.tasks) == 1
+    assert client.calls == 1
+
+
+def test_ingest_reraises_other_errors(two_step_insert):
+    with pytest.raises(APIError):
+        _store(_FailingRpc(TIMEOUT))
+    # No second insert that could duplicate a committed RPC write
+    assert two_step_insert == []
+    assert webhook_ingest._ingest_rpc_available
+
+
+# ============================================================================
+# Default provider
+# ============================================================================
+
+class _ProviderTable:
+    """Chainable providers-table query that returns the given rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+class _DefaultProviderClient:
+    """RPC that raises `error` (or returns no row); the table holds `rows`."""
+
+    def __init__(self, rows, error=None):
+        self.rows = rows
+        self.error = error
+        self.rpc_calls = 0
+
+    def rpc(self, fn, params):
+        self.rpc_calls += 1
+        if self.error:
+            return _FailingRpc(self.error)
+        return _ProviderTable([])
+
+    def table(self, name):
+        return _ProviderTable(self.rows)
+
+
+@pytest.fixture
+def fresh_default_provider(monkeypatch):
+    monkeypatch.setattr(webhook_ingest, "_default_provider_rpc_available", True)
+    invalidate_provider_cache()
+    yield
+    invalidate_provider_cache()
+
+
+def _ensure(client):
+    return asyncio.run(webhook_ingest._ensure_default_provider(client))
+
+
+def test_default_provider_falls_back_when_function_missing(fresh_default_provider):
+    client = _DefaultProviderClient([{"id": "prov"}], MISSING_FUNCTION)
+
+    assert _ensure(client) == {"id": "prov"}
+    assert not webhook_ingest._default_provider_rpc_available
+
+
+def test_default_provider_empty_rpc_result_falls_through(fresh_default_provider):
+    client = _DefaultProviderClient([{"id": "prov"}])
+
+    assert _ensure(client) == {"id": "prov"}
+    assert client.rpc_calls == 1
+
+
+def test_default_provider_reraises_other_errors(fresh_default_provider):
+    with pytest.raises(APIError):
+        _ensure(_DefaultProviderClient([{"id": "prov"}], TIMEOUT))
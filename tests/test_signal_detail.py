@@ -0,0 +1,117 @@
+"""
+Tests for app.api.signals.get_signal, run against an in-memory stand-in
+for the supabase client.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import orjson
+
+from app.api import signals
+
+SIGNAL = {
+    "id": "sig_a", "provider_id": "prov", "symbol": "NQ", "direction": "LONG",
+    "entry_price": 100.0, "sl": 90.0, "tp1": 110.0, "status": "ACTIVE",
+    "entry_time": "2024-01-01T00:00:00+00:00",
+}
+
+
+class _FakeQuery:
+    """Applies eq / order / range to the fake tables on execute()."""
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.filters = []
+        self.sort = None
+        self.bounds = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def order(self, column, desc=False):
+        self.sort = (column, desc)
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def execute(self):
+        self.client.queries.append(self.name)
+        rows = [row for row in self.client.tables[self.name] if all(f(row) for f in self.filters)]
+        if self.sort:
+            column, desc = self.sort
+            rows.sort(key=lambda row: row[column], reverse=desc)
+        if self.bounds:
+            rows = rows[self.bounds[0]:self.bounds[1] + 1]
+        return SimpleNamespace(data=rows)
+
+
+class _FakeSupabase:
+    def __init__(self, events):
+        self.tables = {"canonical_signals": [dict(SIGNAL)], "signal_events": events}
+        self.queries = []
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+
+def _events(count):
+    return [
+        {"signal_id": "sig_a", "event_type": "PRICE_UPDATE", "price": 100.0 + i,
+         "source": "PINESCRIPT", "event_time": f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}+00:00"}
+        for i in range(count)
+    ]
+
+
+def _get(**params):
+    response = asyncio.run(signals.get_signal("sig_a", **{"events_limit": 100, "events_offset": 0, **params}))
+    return orjson.loads(response.body)
+
+
+def test_detail_embeds_most_recent_events(monkeypatch):
+    client = _FakeSupabase(_events(250))
+    monkeypatch.setattr(signals, "get_supabase", lambda: client)
+    signals._detail_cache.clear()
+
+    detail = _get(events_limit=10)
+
+    assert [event["price"] for event in detail["events"]] == [349.0 - i for i in range(10)]
+
+
+def test_detail_pages_cached_per_signal(monkeypatch):
+    client = _FakeSupabase(_events(30))
+    monkeypatch.setattr(signals, "get_supabase", lambda: client)
+    signals._detail_cache.clear()
+
+    first = _get(events_limit=10)
+    second = _get(events_limit=10, events_offset=10)
+    assert _get(events_limit=10) == first
+    assert _get(events_limit=10, events_offset=10) == second
+    assert client.queries.count("signal_events") == 2
+    assert set(signals._detail_cache.get("sig_a")) == {(10, 0), (10, 10)}
+
+
+def test_invalidation_is_scoped(monkeypatch):
+    client = _FakeSupabase(_events(5))
+    monkeypatch.setattr(signals, "get_supabase", lambda: client)
+    signals._detail_cache.clear()
+    _get()
+    signals._detail_cache.set("sig_b", {(100, 0): {"id": "sig_b"}})
+    signals._list_cache.set(("all", None, None, None, 50, 0), {"items": []})
+
+    # A new signal only affects the lists
+    signals.invalidate_signal_lists()
+    assert signals._detail_cache.get("sig_a") is not None
+    assert signals._list_cache.get(("all", None, None, None, 50, 0)) is None
+
+    # A status change drops just that signal's detail pages
+    signals.invalidate_signal("sig_a")
+    assert signals._detail_cache.get("sig_a") is None
+    assert signals._detail_cache.get("sig_b") is not None
@@ -0,0 +1,155 @@
+"""
+Tests for the TaskMagic text alert parser in app.api.webhook_ingest.
+
+The line-scan fast path must return exactly what the original regex-only
+parser returned; it may only decline (return None) and defer to the regex
+scan, never disagree with it.
+"""
+
+import random
+import re
+
+import pytest
+
+from app.api.webhook_ingest import _parse_text_alert, _scan_alert_lines
+
+
+def _reference_parse_text_alert(text: str) -> dict:
+    """The original regex-only parser, kept verbatim as the oracle."""
+    result = {}
+
+    text_upper = text.upper()
+    if "SELL" in text_upper or "SHORT" in text_upper:
+        result["direction"] = "SHORT"
+    elif "BUY" in text_upper or "LONG" in text_upper:
+        result["direction"] = "LONG"
+
+    sym_match = re.search(r"Symbol[:\s]+([A-Za-z0-9!]+)", text, re.IGNORECASE)
+    if sym_match:
+        result["symbol"] = sym_match.group(1).strip().rstrip("!")
+
+    entry_match = re.search(r"Entry[:\s]+([\d.,]+)", text, re.IGNORECASE)
+    if entry_match:
+        result["entry"] = float(entry_match.group(1).replace(",", ""))
+
+    sl_match = re.search(r"Stop\s*Loss[:\s]+([\d.,]+)", text, re.IGNORECASE)
+    if sl_match:
+        result["sl"] = float(sl_match.group(1).replace(",", ""))
+
+    tp_matches = re.findall(r"Take\s*Profit\s*(\d)?[:\s]+([\d.,]+)", text, re.IGNORECASE)
+    if tp_matches:
+        for idx, (tp_num, price) in enumerate(tp_matches):
+            key = f"tp{tp_num or idx + 1}"
+            result[key] = float(price.replace(",", ""))
+    else:
+        for i in range(1, 4):
+            tp_match = re.search(rf"TP{i}[:\s]+([\d.,]+)", text, re.IGNORECASE)
+            if tp_match:
+                result[f"tp{i}"] = float(tp_match.group(1).replace(",", ""))
+
+    if "tp1" not in result:
+        target_matches = re.findall(r"(?:Target|Profit)[:\s]+([\d.,]+)", text, re.IGNORECASE)
+        for i, m in enumerate(target_matches):
+            result[f"tp{i+1}"] = float(m.replace(",", ""))
+
+    return result
+
+
+# ============================================================================
+# Supported alert formats
+# ============================================================================
+
+@pytest.mark.parametrize("text, expected", [
+    (
+        "🔴 SELL ALERT 🔴\n📊 Symbol: NQ1!\n📈 Entry: 20537\n🎯 Stop Loss: 20620.96 (+83.96 points)\n"
+        "✅ Take Profit 1: 20450.00\n✅ Take Profit 2: 20350.00\n✅ Take Profit 3: 20250.00",
+        {"direction": "SHORT", "symbol": "NQ1", "entry": 20537.0, "sl": 20620.96,
+         "tp1": 20450.0, "tp2": 20350.0, "tp3": 20250.0},
+    ),
+    (
+        "🟢 BUY ALERT 🟢\n📊 Symbol: NQ1!\n📈 Entry: 20537\n🎯 Stop Loss: 20450\n"
+        "✅ Take Profit 1: 20600\n✅ Take Profit 3: 20700",
+        {"direction": "LONG", "symbol": "NQ1", "entry": 20537.0, "sl": 20450.0,
+         "tp1": 20600.0, "tp3": 20700.0},
+    ),
+    (
+        "Short\nSymbol: ES\nEntry: 5000\nStop Loss: 5010\nTake Profit: 4990\nTake Profit: 4980",
+        {"direction": "SHORT", "symbol": "ES", "entry": 5000.0, "sl": 5010.0,
+         "tp1": 4990.0, "tp2": 4980.0},
+    ),
+    (
+        "BUY Symbol: NQ1! Entry: 20537 Stop Loss: 20450 Take Profit 1: 20600 Take Profit 2: 20700",
+        {"direction": "LONG", "symbol": "NQ1", "entry": 20537.0, "sl": 20450.0,
+         "tp1": 20600.0, "tp2": 20700.0},
+    ),
+    (
+        "BUY ALERT\nSymbol: EURUSD\nEntry: 1.0850\nStop Loss: 1.0800\nTP1: 1.0900\nTP2: 1.0950\nTP3: 1.1000",
+        {"direction": "LONG", "symbol": "EURUSD", "entry": 1.085, "sl": 1.08,
+         "tp1": 1.09, "tp2": 1.095, "tp3": 1.1},
+    ),
+    (
+        "SELL Symbol: GC1! Entry: 2,350.5 Stop Loss: 2,360 Profit: 2,340",
+        {"direction": "SHORT", "symbol": "GC1", "entry": 2350.5, "sl": 2360.0, "tp1": 2340.0},
+    ),
+    (
+        "long signal symbol BTCUSDT entry 65,000.5 stoploss: 64000 target: 66000 target: 67000",
+        {"direction": "LONG", "symbol": "BTCUSDT", "entry": 65000.5, "sl": 64000.0,
+         "tp1": 66000.0, "tp2": 67000.0},
+    ),
+])
+def test_supported_formats(text, expected):
+    assert _parse_text_alert(text) == expected
+    assert _reference_parse_text_alert(text) == expected
+
+
+# ============================================================================
+# Line-scan fast path vs. the reference parser
+# ============================================================================
+
+@pytest.mark.parametrize("text", [
+    "Symbol: NQ\nEntry: 100\nStop Loss: 90\nTake Profit 1\n110",
+    "SELL\nSymbol: NQ\nEntry: 100\nStop Loss: 110\nTake Profit 1: 95\nTake Profit 3\n90",
+    "BUY\nSymbol: NQ\nEntry: 100\nStop Loss: 90\nTake Profit 1 \n110",
+    "BUY\nSymbol: NQ\nEntry: 100\nStop Loss: 90\nTake Profit 1:\n110",
+    "BUY\nSymbol: NQ\nEntry: 100\nStop Loss: 90\nTake Profit:\n110",
+    "BUY\nSymbol: NQ\nEntry:\n100\nStop Loss: 90\nTake Profit 1: 110",
+])
+def test_value_on_next_line_falls_back_to_regex(text):
+    assert _scan_alert_lines(text) is None
+    assert _parse_text_alert(text) == _reference_parse_text_alert(text)
+
+
+@pytest.mark.parametrize("text", [
+    "🔴 SELL ALERT 🔴\n📊 Symbol: NQ1!\n📈 Entry: 20537\n🎯 Stop Loss: 20620.96 (+83.96 points)\n"
+    "✅ Take Profit 1: 20450.00\n✅ Take Profit 2: 20350.00\n✅ Take Profit 3: 20250.00",
+    "🟢 BUY ALERT 🟢\n📊 Symbol: NQ1!\n📈 Entry: 20537\n🎯 Stop Loss: 20450\n"
+    "✅ Take Profit 1: 20600\n✅ Take Profit 3: 20700",
+    "Short\nSymbol:ES\nEntry:5000\nStop Loss:5010\nTake Profit: 4990\nTake Profit: 4980",
+    "SELL\r\nSymbol: nq1!\r\nEntry: 1,000\r\nStop Loss: 2\r\nTake Profit 1: 3",
+    "SELL\nSymbol: NQ\nEntry: 1\nStop Loss: 2\nTake Profit 12: 3",
+    "BUY\n- Symbol:\tNQ\nEntry: 1\nStop Loss: 2\nTake Profit 1: 3\nTake Profit 2:5",
+])
+def test_fast_path_matches_reference(text):
+    assert _scan_alert_lines(text) is not None
+    assert _parse_text_alert(text) == _reference_parse_text_alert(text)
+
+
+def test_randomized_line_layouts_match_reference():
+    labels = [
+        "Symbol", "symbol", "Entry", "Stop Loss", "StopLoss", "Take Profit",
+        "Take Profit 1", "Take Profit 2", "Take Profit 3", "take profit 12",
+        "TP1", "TP2", "Target", "Profit", "notes", "SELL ALERT", "🔴 BUY",
+    ]
+    separators = [": ", ":", " ", "\t", "\n", ":\n", " \n", "", " : "]
+    values = ["NQ1!", "100", "1,000.5", "110", "", "abc", "12", "1 2", ".5", "20450.00 (+8 pts)"]
+
+    rng = random.Random(20250213)
+    for _ in range(5000):
+        lines = [
+            rng.choice(["", "✅ ", "- "]) + rng.choice(labels) + rng.choice(separators) + rng.choice(values)
+            for _ in range(rng.randint(1, 8))
+        ]
+        text = rng.choice(["\n", "\r\n"]).join(lines)
+        if _scan_alert_lines(text) is None:
+            continue
+        assert _parse_text_alert(text) == _reference_parse_text_alert(text), text